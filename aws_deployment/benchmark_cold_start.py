@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark for lambda_function.py
+
+Simulates Lambda cold starts locally: every run loads the module in a fresh
+interpreter (the Lambda init phase), invokes the handler once (first invoke)
+and then a few more times (warm). Import, init and handle times come from the
+handler's own Server-Timing header.
+
+    python3 benchmark_cold_start.py [runs] [devices] [upstream_ms]
+
+With devices > 0 the Eero API call is replaced by that many synthetic devices
+returned after upstream_ms, otherwise the real API is called using the
+NETWORK_ID / API_TOKEN / API_URL environment variables.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROUTES = ['/', '/api/dashboard']
+WARM_INVOCATIONS = 20
+
+CHILD = r'''
+import contextlib, io, json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, LAMBDA_DIR)
+import lambda_function
+loaded = time.perf_counter()
+
+if DEVICES:
+    def get_all_devices(self):
+        time.sleep(UPSTREAM_MS / 1000)
+        return [{
+            'connected': True, 'wireless': True, 'mac': f"02:00:00:00:{i // 256:02x}:{i % 256:02x}",
+            'hostname': f"device-{i}", 'manufacturer': ['Apple', 'Samsung', 'Dell', 'Sonos'][i % 4],
+            'ips': [f"10.0.{i // 250}.{i % 250}"], 'interface': {'frequency': [2.4, 5.0, 6.1][i % 3]},
+            'connectivity': {'signal_avg': -40 - i % 40}
+        } for i in range(DEVICES)]
+    lambda_function.EeroAPI.get_all_devices = get_all_devices
+
+def invoke():
+    event = {'httpMethod': 'GET', 'path': ROUTE, 'headers': {'Accept-Encoding': 'gzip'}}
+    with contextlib.redirect_stdout(io.StringIO()):
+        t = time.perf_counter()
+        response = lambda_function.lambda_handler(event, None)
+        elapsed = time.perf_counter() - t
+    phases = dict(p.split(';dur=') for p in response['headers']['Server-Timing'].split(', '))
+    return elapsed * 1000, {k: float(v) for k, v in phases.items()}
+
+first, phases = invoke()
+warm = sorted(invoke()[0] for _ in range(WARM_INVOCATIONS))
+print(json.dumps({
+    'load': (loaded - started) * 1000,
+    'first': first,
+    'phases': phases,
+    'warm': warm[len(warm) // 2]
+}))
+'''
+
+def run_cold(route, devices, upstream_ms):
+    """Load and invoke the handler in a fresh interpreter, returning its measurements"""
+    settings = (f"LAMBDA_DIR = {os.path.dirname(os.path.abspath(__file__))!r}\n"
+                f"ROUTE = {route!r}\nDEVICES = {devices}\nUPSTREAM_MS = {upstream_ms}\n"
+                f"WARM_INVOCATIONS = {WARM_INVOCATIONS}\n")
+    result = subprocess.run([sys.executable, '-c', settings + CHILD], capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"Benchmark run failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    devices = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    upstream_ms = int(sys.argv[3]) if len(sys.argv) > 3 else 150
+
+    print(f"{runs} cold starts per route, {devices or 'live'} devices, upstream {upstream_ms} ms (medians, ms)")
+    print(f"{'route':<16}{'module load':>12}{'first invoke':>14}{'import':>9}{'init':>8}{'handle':>9}{'warm':>8}")
+    for route in ROUTES:
+        samples = [run_cold(route, devices, upstream_ms) for _ in range(runs)]
+        phase = lambda name: statistics.median(s['phases'][name] for s in samples)
+        print(f"{route:<16}"
+              f"{statistics.median(s['load'] for s in samples):>12.2f}"
+              f"{statistics.median(s['first'] for s in samples):>14.2f}"
+              f"{phase('import'):>9.2f}{phase('init'):>8.2f}{phase('handle'):>9.2f}"
+              f"{statistics.median(s['warm'] for s in samples):>8.3f}")
+    print("import/init on the first invoke include the module load (Lambda init phase)")
+
+if __name__ == '__main__':
+    main()
@@ -1,21 +1,55 @@
 
+import time
+MODULE_STARTED = time.perf_counter()
+
 import json
 import os
-import requests
-import time
+import gzip
+import hashlib
+import threading
 from datetime import datetime, timedelta
 import base64
 
+try:
+    import brotli  # Optional, add it to the deployment package for br responses
+except ImportError:
+    brotli = None
+
+# Heavy modules are imported on first use by the routes that need them
+requests = None
+MODULE_IMPORTED = time.perf_counter()
+
 # Environment variables (set in Lambda)
 NETWORK_ID = os.environ.get('NETWORK_ID', '')
 API_TOKEN = os.environ.get('API_TOKEN', '')
 API_URL = os.environ.get('API_URL', 'api-user.e2ro.com')
+SNAPSHOT_TTL = int(os.environ.get('SNAPSHOT_TTL', '30'))  # Seconds a snapshot is served without refetching
+SNAPSHOT_STALE_TTL = int(os.environ.get('SNAPSHOT_STALE_TTL', '300'))  # Further seconds it is served while refreshing
+FRONTEND_MAX_AGE = int(os.environ.get('FRONTEND_MAX_AGE', '300'))  # Seconds browsers and edge caches keep the page
+COMPRESS_MIN_SIZE = 1024  # Smaller bodies are sent uncompressed
+
+# Seconds spent per phase in the current invocation, reported in Server-Timing
+phase_times = {'import': 0.0, 'init': 0.0}
+cold_start = True
+
+def import_requests():
+    """Import requests the first time a route needs it"""
+    global requests
+    if requests is None:
+        started = time.perf_counter()
+        import requests as module
+        requests = module
+        phase_times['import'] += time.perf_counter() - started
+    return requests
 
 class EeroAPI:
     def __init__(self):
         self.api_token = API_TOKEN
         self.network_id = NETWORK_ID
         self.api_base = f"https://{API_URL}/2.2"
+        # Pooled session so warm invocations reuse the TLS connection to the Eero API
+        self.session = import_requests().Session()
+        self.session.headers.update(self.get_headers())
     
     def get_headers(self):
         return {
@@ -25,9 +59,10 @@ class EeroAPI:
         }
     
     def get_all_devices(self):
+        """Fetch devices, None if the request failed"""
         try:
             url = f"{self.api_base}/networks/{self.network_id}/devices"
-            response = requests.get(url, headers=self.get_headers(), timeout=10)
+            response = self.session.get(url, timeout=10)
             response.raise_for_status()
             data = response.json()
             
@@ -36,7 +71,12 @@ class EeroAPI:
             return []
         except Exception as e:
             print(f"Error fetching devices: {e}")
-            return []
+            return None
+
+# Module scope survives between warm invocations of the same container
+eero_api = None
+snapshot = {'entry': None, 'fetched_at': 0, 'refreshing': False}
+snapshot_lock = threading.Lock()
 
 def categorize_device_os(device):
     """Categorize device OS"""
@@ -102,6 +142,67 @@ def process_devices(devices):
         'last_update': datetime.now().isoformat()
     }
 
+def get_eero_api():
+    """Create the API client on first use, counted as init time"""
+    global eero_api
+    if eero_api is None:
+        started = time.perf_counter()
+        before = phase_times['import']
+        eero_api = EeroAPI()
+        phase_times['init'] += time.perf_counter() - started - (phase_times['import'] - before)
+    return eero_api
+
+def refresh_snapshot():
+    """Fetch and process devices into the snapshot, keeping the old one if the fetch fails"""
+    try:
+        devices = get_eero_api().get_all_devices()
+        if devices is not None or snapshot['entry'] is None:
+            # Swap in a whole new entry so readers never see a body with another body's ETag
+            snapshot['entry'] = make_entry(json.dumps(process_devices(devices or [])))
+            snapshot['fetched_at'] = time.time()
+    finally:
+        with snapshot_lock:
+            snapshot['refreshing'] = False
+
+def get_snapshot():
+    """Return (entry, cache status) for the dashboard data
+    
+    Fresh snapshots are answered from memory. Stale ones are still answered
+    from memory while a background thread refetches; the thread only runs
+    while the container is thawed, so it finishes during this or the next
+    invocation. Past the stale window the fetch always happens inline, even
+    if a background refresh is still flagged - it may never finish.
+    """
+    age = time.time() - snapshot['fetched_at']
+    if snapshot['entry'] is not None and age < SNAPSHOT_TTL:
+        return snapshot['entry'], 'HIT'
+    
+    if snapshot['entry'] is not None and age < SNAPSHOT_TTL + SNAPSHOT_STALE_TTL:
+        with snapshot_lock:
+            start = not snapshot['refreshing']
+            snapshot['refreshing'] = True
+        if start:
+            threading.Thread(target=refresh_snapshot, daemon=True).start()
+        return snapshot['entry'], 'STALE'
+    # Also clears a refreshing flag left behind by a thread that died with its container
+    refresh_snapshot()
+    return snapshot['entry'], 'MISS'
+
+def make_entry(body):
+    """Cacheable body with its content-hash ETag; compressed variants are added on first use"""
+    data = body.encode()
+    return {'body': body, 'etag': '"' + hashlib.sha1(data).hexdigest()[:16] + '"', 'data': data, 'encoded': {}}
+
+def encode_body(entry, encoding):
+    """Base64 of the body compressed with encoding, computed once per entry"""
+    if encoding not in entry['encoded']:
+        if encoding == 'br':
+            compressed = brotli.compress(entry['data'], quality=5)
+        else:
+            compressed = gzip.compress(entry['data'], 6)
+        entry['encoded'][encoding] = base64.b64encode(compressed).decode()
+    return entry['encoded'][encoding]
+
 def get_frontend_html():
     """Return the frontend HTML"""
     return """<!DOCTYPE html>
@@ -241,46 +342,120 @@ def get_frontend_html():
 </body>
 </html>"""
 
-def lambda_handler(event, context):
-    """Main Lambda handler"""
+# Built and compressed once per container instead of on every page view
+FRONTEND = make_entry(get_frontend_html())
+FRONTEND['encoded']['gzip'] = base64.b64encode(gzip.compress(FRONTEND['data'], 9)).decode()
+if brotli:
+    FRONTEND['encoded']['br'] = base64.b64encode(brotli.compress(FRONTEND['data'])).decode()
+
+def get_header(event, name):
+    """Request header regardless of the case API Gateway delivered it in"""
+    headers = event.get('headers') or {}
+    return next((v for k, v in headers.items() if k.lower() == name), None) or ''
+
+def choose_encoding(event):
+    """Best encoding the client accepts: br, then gzip, else None"""
+    accepted = set()
+    for item in get_header(event, 'accept-encoding').split(','):
+        coding, _, params = item.partition(';')
+        params = params.strip()
+        try:
+            weight = float(params[2:]) if params.startswith('q=') else 1
+        except ValueError:
+            weight = 1
+        if weight > 0:
+            accepted.add(coding.strip().lower())
+    if brotli and ('br' in accepted or '*' in accepted):
+        return 'br'
+    if 'gzip' in accepted or '*' in accepted:
+        return 'gzip'
+    return None
+
+def encoded_etag(etag, encoding):
+    """Strong ETag of one representation: the content hash plus its encoding"""
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+def etag_matches(event, etag):
+    """True if the client's If-None-Match names this content in any encoding"""
+    if_none_match = get_header(event, 'if-none-match')
+    if if_none_match.strip() == '*':
+        return True
+    tags = [tag.strip().removeprefix('W/').strip('"') for tag in if_none_match.split(',')]
+    return etag.strip('"') in [tag.removesuffix('-br').removesuffix('-gzip') for tag in tags]
+
+def cached_response(event, entry, content_type, cache_control, headers=None):
+    """200 with the best encoding the client accepts, or 304 if its ETag still matches"""
+    encoding = choose_encoding(event) if len(entry['data']) >= COMPRESS_MIN_SIZE else None
+    headers = {
+        'Content-Type': content_type,
+        'ETag': encoded_etag(entry['etag'], encoding),
+        'Cache-Control': cache_control,
+        'Vary': 'Accept-Encoding',
+        **(headers or {})
+    }
+    if etag_matches(event, entry['etag']):
+        return {'statusCode': 304, 'headers': headers, 'body': ''}
+    
+    if encoding:
+        headers['Content-Encoding'] = encoding
+        return {'statusCode': 200, 'headers': headers, 'body': encode_body(entry, encoding), 'isBase64Encoded': True}
+    return {'statusCode': 200, 'headers': headers, 'body': entry['body']}
+
+def handle_request(event):
+    """Route a request to its handler"""
     
     # Handle different HTTP methods and paths
     http_method = event.get('httpMethod', 'GET')
     path = event.get('path', '/')
     
     if path == '/' and http_method == 'GET':
-        # Serve frontend
-        return {
-            'statusCode': 200,
-            'headers': {'Content-Type': 'text/html'},
-            'body': get_frontend_html()
-        }
+        # Serve frontend, it only changes on deploy
+        return cached_response(event, FRONTEND, 'text/html', f"public, max-age={FRONTEND_MAX_AGE}")
     
     elif path == '/api/dashboard' and http_method == 'GET':
         # Serve API data
         try:
-            eero_api = EeroAPI()
-            devices = eero_api.get_all_devices()
-            dashboard_data = process_devices(devices)
+            entry, cache_status = get_snapshot()
             
-            return {
-                'statusCode': 200,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps(dashboard_data)
-            }
+            # Edge caches may keep it until the snapshot itself goes stale
+            fresh_for = max(0, int(SNAPSHOT_TTL - (time.time() - snapshot['fetched_at'])))
+            return cached_response(
+                event, entry, 'application/json',
+                f"public, max-age={fresh_for}, stale-while-revalidate={SNAPSHOT_STALE_TTL}",
+                {'Access-Control-Allow-Origin': '*', 'X-Cache': cache_status}
+            )
         except Exception as e:
             return {
                 'statusCode': 500,
-                'headers': {'Content-Type': 'application/json'},
+                'headers': {'Content-Type': 'application/json', 'Cache-Control': 'no-store'},
                 'body': json.dumps({'error': str(e)})
             }
     
     else:
         return {
             'statusCode': 404,
-            'headers': {'Content-Type': 'application/json'},
+            'headers': {'Content-Type': 'application/json', 'Cache-Control': 'no-store'},
             'body': json.dumps({'error': 'Not found'})
         }
+
+def lambda_handler(event, context):
+    """Main Lambda handler, reporting import/init/handle time per invocation"""
+    global cold_start
+    started = time.perf_counter()
+    phase_times.update({'import': 0.0, 'init': 0.0})
+    
+    response = handle_request(event)
+    
+    handle = time.perf_counter() - started - phase_times['import'] - phase_times['init']
+    if cold_start:
+        # Module load ran in the Lambda init phase just before this invocation
+        phase_times['import'] += MODULE_IMPORTED - MODULE_STARTED
+        phase_times['init'] += MODULE_READY - MODULE_IMPORTED
+    timing = {name: round(seconds * 1000, 2) for name, seconds in phase_times.items()}
+    timing['handle'] = round(handle * 1000, 2)
+    response.setdefault('headers', {})['Server-Timing'] = ', '.join(f"{name};dur={ms}" for name, ms in timing.items())
+    print(json.dumps({'path': event.get('path', '/'), 'cold_start': cold_start, **timing}))
+    cold_start = False
+    return response
+
+MODULE_READY = time.perf_counter()
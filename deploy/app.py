@@ -5,23 +5,106 @@ Auto-deployable from GitHub
 """
 import os
 import sys
+import copy
 import json
+import math
+import http.client
 import requests
-import speedtest
+import subprocess
 import threading
 import time
 import socket
+import ssl
+import struct
+import base64
+import bisect
+import hashlib
+import html
+import random
+import re
+import uuid
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
-from flask import Flask, jsonify, request, send_from_directory
+from urllib.parse import urlsplit
+from flask import Flask, Response, g, jsonify, request, send_from_directory
 from flask_cors import CORS
 import logging
 
+try:
+    from flask_sock import Sock
+except ImportError:
+    Sock = None
+
+try:
+    import cairosvg  # PNG chart renders; also needs the system cairo library
+except (ImportError, OSError):
+    cairosvg = None
+
 # Configuration
 CURRENT_VERSION = "5.2.4-github"
 INSTALL_DIR = "/opt/eero"
 CONFIG_FILE = f"{INSTALL_DIR}/app/config.json"
 TOKEN_FILE = f"{INSTALL_DIR}/app/.eero_token"
 LOG_DIR = f"{INSTALL_DIR}/logs"
+SPEEDTEST_WORKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'speedtest_worker.py')
+CHART_PAGES = (  # frontend/index.html as copied next to app.py by the installers, or in a checkout
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'index.html'),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'frontend', 'index.html')
+)
+CHART_PAGE_PLACEHOLDER = '<script id="initial-snapshot" type="application/json">null</script>'
+SPEEDTEST_HISTORY_FILE = f"{INSTALL_DIR}/app/speedtest_history.jsonl"
+SPEEDTEST_SERVER_CACHE = f"{INSTALL_DIR}/app/speedtest_servers.json"
+REFRESH_INTERVAL = 60  # Seconds between background cache refreshes (config: refresh_interval)
+HISTORY_HOURS = 2  # Hours of connected user history kept (config: history_hours)
+CONFIG_POLL_INTERVAL = 2  # Seconds between checks for config/token file edits
+TRACE_BUFFER_SIZE = 50  # Recent refresh traces kept for /api/admin/traces
+TRACING = {  # Defaults for the tracing config entry
+    'enabled': False,
+    'otlp_file': None  # Also append each trace as an OTLP-JSON line to this file
+}
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)  # Seconds
+METRICS_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)  # Bytes
+METRICS_SPEEDTEST_BUCKETS = (10, 20, 30, 45, 60, 90, 120, 180)  # Seconds
+STREAM_QUEUE_SIZE = 32  # Events buffered per stream client before dropping oldest
+STREAM_HEARTBEAT = 15  # Seconds between keepalive comments on idle streams
+DEVICE_DELTA_LOG = 64  # Device list deltas kept so reconnecting clients can resume
+DEVICE_PAGE_MAX = 500  # Largest page /api/devices will return in one response
+SEARCH_LIMIT_MAX = 50  # Most results /api/devices/search will return
+SEARCH_SCAN_MAX = 256  # Index entries scanned for very broad prefixes like a single letter
+SEARCH_REBUILD_THRESHOLD = 2000  # Delta size above which the search index is re-sorted wholesale
+RESPONSE_CACHE_SIZE = 128  # Serialized API responses kept per cache version
+RENDER_PROFILES = ('standard', 'low-power')  # Chart rendering profiles selectable from the admin panel
+RENDER_SIZE_DEFAULT = (640, 360)  # Chart render size when ?width=/?height= are not given
+RENDER_SIZE_MIN = (160, 120)
+RENDER_SIZE_MAX = (1920, 1080)
+SPEEDTEST_QUEUE_MAX = 3  # Speedtests allowed to wait behind the running one
+SPEEDTEST_TIMEOUT = 120  # Seconds before a running speedtest is killed
+SPEEDTEST_KILL_GRACE = 5  # Seconds a worker gets to exit after SIGTERM before SIGKILL
+SPEEDTEST_NICE = 10  # Niceness of the speedtest worker process
+SPEEDTEST_MEMORY_MB = 512  # Data (heap) cap for the speedtest worker
+SPEEDTEST_SAMPLE_INTERVAL = 0.5  # Seconds between live throughput samples
+SPEEDTEST_HISTORY_MAX = 500  # Finished speedtests kept in the history
+SPEEDTEST_SERVER_TTL = 24 * 3600  # Seconds a measured server choice is reused before re-selecting
+SPEEDTEST_SCHEDULE_POLL = 300  # Seconds between schedule config checks while waiting
+SPEEDTEST_SCHEDULE = {  # Defaults for the speedtest_schedule config entry
+    'enabled': False,
+    'interval_hours': 6,  # Time between scheduled runs, at least 1
+    'off_peak_hours': [1, 6],  # Local [start, end) hours runs may start in, may wrap midnight
+    'jitter_minutes': 20  # Random delay so dashboards don't all test at once
+}
+PROBE_INTERVAL = 10  # Seconds between latency probe rounds
+PROBE_TIMEOUT = 2  # Seconds before a probe counts as lost
+PROBE_BUCKET = 60  # Seconds of probe rounds summarized into each latency point
+PROBE_HISTORY_MAX = 1440  # Latency points kept (24 hours of buckets)
+LATENCY_PROBES = {  # Defaults for the latency_probes config entry
+    'enabled': True  # Off stops all probing of probe_targets
+}
+PROBE_TARGETS = [  # Defaults for the probe_targets config entry
+    {'name': 'Cloudflare', 'type': 'tcp', 'host': '1.1.1.1', 'port': 443},
+    {'name': 'Google DNS', 'type': 'dns', 'host': '8.8.8.8', 'query': 'google.com'},
+    {'name': 'Connectivity check', 'type': 'http', 'url': 'http://www.gstatic.com/generate_204'}
+]
+INITIAL_DASHBOARD_FIELDS = ('connected_users', 'signal_strength_avg', 'device_os', 'frequency_distribution', 'last_update', 'series_version', 'series_epoch')
 
 # Create directories
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -39,39 +122,404 @@ logging.basicConfig(
 # Flask app setup
 app = Flask(__name__)
 CORS(app)
+app.config['SOCK_SERVER_OPTIONS'] = {'ping_interval': 25}
+sock = Sock(app) if Sock else None
 
-def load_config():
-    """Load configuration from file"""
+# Prometheus metrics - each instrument takes one uncontended lock per update
+metrics = []
+
+def format_metric_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Metric:
+    """One metric family with its values keyed by label values"""
+    kind = 'untyped'
+    
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.lock = threading.Lock()
+        self.values = {}
+        metrics.append(self)
+    
+    def label_text(self, values, extra=()):
+        pairs = list(zip(self.labels, values)) + list(extra)
+        if not pairs:
+            return ''
+        escape = lambda v: str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in pairs) + '}'
+    
+    def samples(self):
+        """(suffix, label values, extra labels, value) tuples for the exposition"""
+        with self.lock:
+            return [('', labels, (), value) for labels, value in self.values.items()]
+    
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{self.label_text(labels, extra)} {format_metric_value(value)}")
+        return lines
+
+class Counter(Metric):
+    kind = 'counter'
+    
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+class Gauge(Metric):
+    """Gauge read when scraped: collect() returns {label values: value}"""
+    kind = 'gauge'
+    
+    def __init__(self, name, help_text, labels=(), collect=None):
+        super().__init__(name, help_text, labels)
+        self.collect = collect
+    
+    def samples(self):
+        try:
+            values = self.collect()
+        except Exception as e:
+            logging.error(f"Metric {self.name} collect error: {e}")
+            return []
+        return [('', labels, (), value) for labels, value in values.items() if value is not None]
+
+class Histogram(Metric):
+    kind = 'histogram'
+    
+    def __init__(self, name, help_text, labels=(), buckets=METRICS_LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = buckets
+    
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            counts = self.values.get(labels)
+            if counts is None:
+                # One count per bucket plus +Inf, then the running sum
+                counts = self.values[labels] = [0] * (len(self.buckets) + 1) + [0]
+            counts[index] += 1
+            counts[-1] += value
+    
+    def samples(self):
+        with self.lock:
+            values = [(labels, list(counts)) for labels, counts in self.values.items()]
+        samples = []
+        for labels, counts in values:
+            total = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                total += count
+                samples.append(('_bucket', labels, (('le', format_metric_value(bound)),), total))
+            samples.append(('_sum', labels, (), counts[-1]))
+            samples.append(('_count', labels, (), total))
+        return samples
+
+def process_rss():
+    """Resident set size in bytes, None where /proc isn't available"""
     try:
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, 'r') as f:
-                return json.load(f)
-    except Exception as e:
-        logging.error(f"Config load error: {e}")
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+UPSTREAM_SECONDS = Histogram('eero_upstream_request_seconds', 'Eero API get_all_devices latency')
+UPSTREAM_ERRORS = Counter('eero_upstream_errors_total', 'Eero API device fetches that failed')
+UPDATE_SECONDS = Histogram('eero_update_cache_seconds', 'Time update_cache() spent refreshing from upstream')
+UPDATE_CALLS = Counter('eero_update_cache_calls_total', 'update_cache() calls that fetched or were coalesced', ('result',))
+RESPONSE_CACHE_LOOKUPS = Counter('eero_response_cache_lookups_total', 'Response cache lookups', ('result',))
+REQUEST_SECONDS = Histogram('eero_http_request_seconds', 'Request latency by route', ('route',))
+RESPONSE_BYTES = Histogram('eero_http_response_bytes', 'Serialized response size by route', ('route',), METRICS_SIZE_BUCKETS)
+SPEEDTEST_SECONDS = Histogram('eero_speedtest_seconds', 'Speedtest run time by final state', ('state',), METRICS_SPEEDTEST_BUCKETS)
+Gauge('eero_devices_by_band', 'Wireless devices per frequency band', ('band',),
+      lambda: {(band,): count for band, count in data_cache['frequency_distribution'].items()})
+Gauge('eero_devices_by_os', 'Wireless devices per OS', ('os',),
+      lambda: {(os_type,): count for os_type, count in data_cache['device_os'].items()})
+Gauge('eero_history_points', 'Points held in each history series', ('series',),
+      lambda: {(name,): len(data_cache[name]) for name in ('connected_users', 'latency', 'speedtest_series')})
+Gauge('process_resident_memory_bytes', 'Resident memory size in bytes', (), lambda: {(): process_rss()})
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_SECONDS.observe(time.perf_counter() - started, route)
+        if not response.is_streamed:
+            RESPONSE_BYTES.observe(response.calculate_content_length() or 0, route)
+    return response
+
+# Tracing - spans around the refresh stages, kept in a ring buffer
+class Span:
+    """One timed stage of a trace; a span opened with no trace active starts one"""
+    __slots__ = ('tracer', 'name', 'span_id', 'parent_id', 'attributes', 'start', 'end', 'error', 'trace')
     
-    # Default configuration
-    return {
-        "network_id": "20478317",
-        "environment": "production",
-        "api_url": "api-user.e2ro.com",
-        "last_updated": datetime.now().isoformat()
-    }
+    def __init__(self, tracer, name, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.attributes = attributes
+        self.error = None
+    
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+    
+    def __enter__(self):
+        stack = self.tracer.stack()
+        if stack:
+            self.parent_id, self.trace = stack[-1].span_id, stack[-1].trace
+        else:
+            self.parent_id, self.trace = None, {'trace_id': os.urandom(16).hex(), 'spans': []}
+        stack.append(self)
+        self.start = time.time_ns()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.time_ns()
+        if exc is not None:
+            self.error = str(exc) or exc_type.__name__
+        stack = self.tracer.stack()
+        stack.pop()
+        self.trace['spans'].append(self)
+        if not stack:
+            self.tracer.finish(self, self.trace)
+        return False
 
-def save_config(config):
-    """Save configuration to file"""
+class NullSpan:
+    """Returned while tracing is off, so instrumented code costs one call and a config lookup"""
+    def set(self, **attributes):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NULL_SPAN = NullSpan()
+
+class Tracer:
+    """Collect spans per thread and keep finished traces in a ring buffer, optionally exporting OTLP-JSON"""
+    def __init__(self, size=TRACE_BUFFER_SIZE):
+        self.lock = threading.Lock()
+        self.traces = deque(maxlen=size)
+        self.local = threading.local()
+    
+    def settings(self):
+        return {**TRACING, **(config_service.get('tracing') or {})}
+    
+    def stack(self):
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+    
+    def span(self, name, **attributes):
+        if not getattr(self.local, 'stack', None) and not (config_service.get('tracing') or TRACING).get('enabled'):
+            return NULL_SPAN
+        return Span(self, name, attributes)
+    
+    def finish(self, root, trace):
+        record = {
+            'trace_id': trace['trace_id'],
+            'name': root.name,
+            'start': datetime.fromtimestamp(root.start / 1e9).isoformat(),
+            'duration_ms': round((root.end - root.start) / 1e6, 3),
+            'spans': [{
+                'span_id': span.span_id,
+                'parent_id': span.parent_id,
+                'name': span.name,
+                'offset_ms': round((span.start - root.start) / 1e6, 3),
+                'duration_ms': round((span.end - span.start) / 1e6, 3),
+                'attributes': span.attributes,
+                'error': span.error
+            } for span in sorted(trace['spans'], key=lambda span: span.start)]
+        }
+        with self.lock:
+            self.traces.append(record)
+        path = self.settings().get('otlp_file')
+        if path:
+            try:
+                with open(path, 'a') as f:
+                    f.write(json.dumps(self.otlp(trace)) + '\n')
+            except OSError as e:
+                logging.error(f"Trace export error: {e}")
+    
+    @staticmethod
+    def otlp_value(value):
+        if isinstance(value, bool):
+            return {'boolValue': value}
+        if isinstance(value, int):
+            return {'intValue': str(value)}
+        if isinstance(value, float):
+            return {'doubleValue': value}
+        return {'stringValue': str(value)}
+    
+    def otlp(self, trace):
+        """OTLP/JSON ExportTraceServiceRequest for one trace"""
+        spans = [{
+            'traceId': trace['trace_id'],
+            'spanId': span.span_id,
+            'parentSpanId': span.parent_id or '',
+            'name': span.name,
+            'kind': 1,  # SPAN_KIND_INTERNAL
+            'startTimeUnixNano': str(span.start),
+            'endTimeUnixNano': str(span.end),
+            'attributes': [{'key': key, 'value': self.otlp_value(value)} for key, value in span.attributes.items()],
+            'status': {'code': 2, 'message': span.error} if span.error else {}
+        } for span in trace['spans']]
+        return {'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': 'eero-dashboard'}}]},
+            'scopeSpans': [{'scope': {'name': 'eero-dashboard', 'version': CURRENT_VERSION}, 'spans': spans}]
+        }]}
+    
+    def query(self, limit=20, min_ms=0, name=None):
+        """Finished traces, newest first"""
+        with self.lock:
+            traces = list(self.traces)
+        traces = [trace for trace in reversed(traces)
+                  if trace['duration_ms'] >= min_ms and (name is None or trace['name'] == name)]
+        return traces[:limit]
+
+tracer = Tracer()
+
+def file_stamp(path):
+    """(mtime, size) of a file, None if it doesn't exist"""
     try:
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=2)
-        os.chmod(CONFIG_FILE, 0o600)
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+class ConfigService:
+    """config.json held in memory, reloaded when the file changes on disk
+    
+    Reads never touch the disk. Subscribers are called with the changed keys
+    whenever the config is saved here or edited on disk; the token file is
+    watched as well and reported as the 'token' key. Edits are picked up by
+    polling file mtimes every CONFIG_POLL_INTERVAL seconds from watch().
+    """
+    def __init__(self, path=CONFIG_FILE, token_path=TOKEN_FILE):
+        self.lock = threading.Lock()
+        self.path = path
+        self.token_path = token_path
+        self.subscribers = []
+        self.stamps = {path: file_stamp(path), token_path: file_stamp(token_path)}
+        try:
+            self.config = self.read()
+        except Exception as e:
+            logging.error(f"Config load error: {e}")
+            self.config = self.defaults()
+    
+    @staticmethod
+    def defaults():
+        return {
+            "network_id": "20478317",
+            "environment": "production",
+            "api_url": "api-user.e2ro.com",
+            "render_profile": "standard",
+            "speedtest_schedule": dict(SPEEDTEST_SCHEDULE),
+            "latency_probes": dict(LATENCY_PROBES),
+            "probe_targets": PROBE_TARGETS,
+            "tracing": dict(TRACING),
+            "last_updated": datetime.now().isoformat()
+        }
+    
+    def read(self):
+        if not os.path.exists(self.path):
+            return self.defaults()
+        with open(self.path, 'r') as f:
+            return json.load(f)
+    
+    def get(self, key, default=None):
+        return self.config.get(key, default)
+    
+    def snapshot(self):
+        """A copy of the config that callers may modify and save()"""
+        return copy.deepcopy(self.config)
+    
+    def subscribe(self, callback, keys=None):
+        """Call callback(config, changed) when any of keys (or any key) changes"""
+        self.subscribers.append((set(keys) if keys else None, callback))
+    
+    def save(self, config):
+        """Write the config to disk and notify subscribers of what changed"""
+        with self.lock:
+            try:
+                with open(self.path, 'w') as f:
+                    json.dump(config, f, indent=2)
+                os.chmod(self.path, 0o600)
+            except Exception as e:
+                logging.error(f"Config save error: {e}")
+                return False
+            self.stamps[self.path] = file_stamp(self.path)
+            changed = self.replace(config)
+        self.notify(changed)
         return True
-    except Exception as e:
-        logging.error(f"Config save error: {e}")
-        return False
+    
+    def replace(self, config):
+        previous, self.config = self.config, config
+        return {key for key in previous.keys() | config.keys() if previous.get(key) != config.get(key)}
+    
+    def check(self):
+        """Reload the config if its file changed on disk since the last check"""
+        changed = set()
+        with self.lock:
+            stamp = file_stamp(self.path)
+            if stamp != self.stamps[self.path]:
+                try:
+                    config = self.read()
+                except Exception as e:
+                    # Likely caught mid-write - keep the current config and retry next time
+                    logging.error(f"Config reload error: {e}")
+                else:
+                    self.stamps[self.path] = stamp
+                    changed = self.replace(config)
+            stamp = file_stamp(self.token_path)
+            if stamp != self.stamps[self.token_path]:
+                self.stamps[self.token_path] = stamp
+                changed.add('token')
+        if changed:
+            logging.info(f"Config changed on disk: {', '.join(sorted(changed))}")
+            self.notify(changed)
+    
+    def notify(self, changed):
+        for keys, callback in list(self.subscribers):
+            if changed and (keys is None or keys & changed):
+                try:
+                    callback(self.config, changed)
+                except Exception as e:
+                    logging.error(f"Config subscriber error: {e}")
+    
+    def watch(self):
+        while True:
+            time.sleep(CONFIG_POLL_INTERVAL)
+            self.check()
+
+config_service = ConfigService()
+
+def load_config():
+    """Copy of the current configuration, for editing and passing to save_config()"""
+    return config_service.snapshot()
+
+def save_config(config):
+    """Save configuration to file"""
+    return config_service.save(config)
 
 def get_api_url():
     """Get API URL from config"""
-    config = load_config()
-    return config.get('api_url', 'api-user.e2ro.com')
+    return config_service.get('api_url', 'api-user.e2ro.com')
+
+def refresh_interval():
+    return config_service.get('refresh_interval', REFRESH_INTERVAL)
+
+def history_hours():
+    return config_service.get('history_hours', HISTORY_HOURS)
 
 class EeroAPI:
     def __init__(self):
@@ -96,8 +544,7 @@ class EeroAPI:
     
     def load_network_id(self):
         """Load network ID from config"""
-        config = load_config()
-        return config.get('network_id', '20478317')
+        return config_service.get('network_id', '20478317')
     
     def reload_network_id(self):
         """Reload network ID from config"""
@@ -107,6 +554,15 @@ class EeroAPI:
         """Reload API token"""
         self.api_token = self.load_token()
     
+    def apply_config(self, config, changed):
+        """Config subscriber - pick up a new network, API URL or token without a restart"""
+        if 'token' in changed:
+            self.reload_token()
+        self.network_id = self.load_network_id()
+        self.api_url = get_api_url()
+        self.api_base = f"https://{self.api_url}/2.2"
+        logging.info(f"EeroAPI updated - API: {self.api_url}, Network: {self.network_id}")
+    
     def get_headers(self):
         """Get request headers"""
         headers = {
@@ -119,12 +575,16 @@ class EeroAPI:
     
     def get_all_devices(self):
         """Fetch all devices from Eero API"""
+        started = time.perf_counter()
         try:
             url = f"{self.api_base}/networks/{self.network_id}/devices"
             logging.info(f"Fetching devices from: {url}")
-            response = self.session.get(url, headers=self.get_headers(), timeout=10)
+            with tracer.span('http_get', url=url) as span:
+                response = self.session.get(url, headers=self.get_headers(), timeout=10)
+                span.set(status=response.status_code, bytes=len(response.content))
             response.raise_for_status()
-            devices_data = response.json()
+            with tracer.span('json_parse', bytes=len(response.content)):
+                devices_data = response.json()
             
             if 'data' in devices_data:
                 if isinstance(devices_data['data'], list):
@@ -137,8 +597,11 @@ class EeroAPI:
             logging.warning("No device data in response")
             return []
         except Exception as e:
+            UPSTREAM_ERRORS.inc()
             logging.error(f"Device fetch error: {e}")
             return []
+        finally:
+            UPSTREAM_SECONDS.observe(time.perf_counter() - started)
 
 def safe_str(value, default=''):
     """Safely convert value to string"""
@@ -207,6 +670,7 @@ def convert_signal_dbm_to_percent(signal_dbm):
 # Initialize Eero API
 try:
     eero_api = EeroAPI()
+    config_service.subscribe(eero_api.apply_config, ('network_id', 'api_url', 'token'))
     logging.info("Eero API initialized successfully")
 except Exception as e:
     logging.error(f"Failed to initialize Eero API: {e}")
@@ -220,133 +684,1005 @@ data_cache = {
     'devices': [],
     'last_update': None,
     'speedtest_running': False,
-    'speedtest_result': None
+    'speedtest_result': None,
+    'speedtest_series': [],  # Completed speedtests, oldest first, for the trend chart
+    'latency': [],  # Probe latency percentiles and loss per PROBE_BUCKET, oldest first
+    'version': 0,
+    'series_version': 0,  # seq of the newest history point
+    'series_epoch': int(time.time())  # seqs from a previous process are not resumable
+}
+cache_lock = threading.Lock()
+version_lock = threading.Lock()
+last_refresh = 0
+
+def touch_cache():
+    """Bump the cache version so cached responses are rebuilt"""
+    with version_lock:
+        data_cache['version'] += 1
+
+class ResponseCache:
+    """Serialized JSON bodies and ETags per endpoint, rebuilt when the cache version changes"""
+    def __init__(self, size=RESPONSE_CACHE_SIZE):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.size = size
+    
+    def get(self, key, build, render=None):
+        """Return (body, etag) for key, rendering build() only if the cache moved on"""
+        version = data_cache['version']
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] == version:
+                self.entries.move_to_end(key)
+                RESPONSE_CACHE_LOOKUPS.inc('hit')
+                return entry[1], entry[2]
+        RESPONSE_CACHE_LOOKUPS.inc('miss')
+        
+        data = build()
+        body = render(data) if render else json.dumps(data, separators=(',', ':')).encode()
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        with self.lock:
+            self.entries[key] = (version, body, etag)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return body, etag
+
+response_cache = ResponseCache()
+
+def cached_response(key, build, render=None, mimetype='application/json'):
+    """Response served from the response cache with ETag revalidation, JSON unless render is given"""
+    body, etag = response_cache.get(key, build, render)
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if request.if_none_match.contains(etag.strip('"')):
+        return Response(status=304, headers=headers)
+    return Response(body, mimetype=mimetype, headers=headers)
+
+class StreamClient:
+    """Bounded event queue for one connected stream client"""
+    def __init__(self, maxlen=STREAM_QUEUE_SIZE):
+        self.events = deque(maxlen=maxlen)
+        self.condition = threading.Condition()
+        self.dropped = 0
+    
+    def put(self, event):
+        """Queue an event, dropping the oldest one if the client is behind"""
+        with self.condition:
+            if len(self.events) == self.events.maxlen:
+                self.dropped += 1
+            self.events.append(event)
+            self.condition.notify()
+    
+    def get(self, timeout):
+        """Wait for the next event, returning None on timeout"""
+        with self.condition:
+            if not self.events:
+                self.condition.wait(timeout)
+            return self.events.popleft() if self.events else None
+    
+    def reset(self):
+        """Discard queued events after the client has been resynced"""
+        with self.condition:
+            self.events.clear()
+            self.dropped = 0
+
+class EventBroker:
+    """Fan out dashboard events to every connected stream client"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clients = set()
+        self.event_id = 0
+    
+    def subscribe(self, client=None):
+        client = client or StreamClient()
+        with self.lock:
+            self.clients.add(client)
+        logging.info(f"Stream client connected ({len(self.clients)} active)")
+        return client
+    
+    def unsubscribe(self, client):
+        with self.lock:
+            self.clients.discard(client)
+        logging.info(f"Stream client disconnected ({len(self.clients)} active, {client.dropped} events dropped)")
+    
+    def publish(self, event_type, data):
+        """Serialize an event once and queue it for all clients"""
+        with self.lock:
+            self.event_id += 1
+            event = format_sse(event_type, data, self.event_id)
+            clients = list(self.clients)
+        for client in clients:
+            client.put(event)
+
+def format_sse(event_type, data, event_id=None):
+    """Format a Server-Sent Events message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return '\n'.join(lines) + '\n\n'
+
+event_broker = EventBroker()
+
+class DeviceTracker:
+    """Track the device list by MAC and publish versioned join/leave/change deltas"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.devices = {}
+        self.device_list = []
+        self.version = 0
+        self.epoch = int(time.time())  # Versions from a previous process are not resumable
+        self.deltas = deque(maxlen=DEVICE_DELTA_LOG)
+        self.clients = set()
+    
+    def update(self, device_list):
+        """Diff a new device list against the last one, publish and return the changes"""
+        current = {device['mac']: device for device in device_list}
+        joined = [device for mac, device in current.items() if mac not in self.devices]
+        left = [mac for mac in self.devices if mac not in current]
+        changed = []
+        for mac, device in current.items():
+            previous = self.devices.get(mac)
+            if previous is not None and previous != device:
+                changed.append({
+                    'mac': mac,
+                    'fields': {k: v for k, v in device.items() if previous.get(k) != v}
+                })
+        
+        with self.lock:
+            self.devices = current
+            self.device_list = device_list
+            if not (joined or left or changed):
+                return joined, left, changed
+            self.version += 1
+            message = json.dumps({
+                'type': 'delta',
+                'epoch': self.epoch,
+                'version': self.version,
+                'joined': joined,
+                'left': left,
+                'changed': changed
+            }, separators=(',', ':'))
+            self.deltas.append((self.version, message))
+            clients = list(self.clients)
+        
+        for client in clients:
+            client.put(message)
+        return joined, left, changed
+    
+    def full_message(self):
+        """Serialize the whole device list for a new or resyncing client"""
+        with self.lock:
+            return json.dumps({
+                'type': 'full',
+                'epoch': self.epoch,
+                'version': self.version,
+                'devices': self.device_list
+            }, separators=(',', ':'))
+    
+    def subscribe(self, since=None, epoch=None, client=None):
+        """Register a client and return the messages that bring it up to date"""
+        client = client or StreamClient()
+        with self.lock:
+            self.clients.add(client)
+            oldest = self.deltas[0][0] if self.deltas else self.version + 1
+            if since is not None and epoch == self.epoch and oldest - 1 <= since <= self.version:
+                backlog = [message for version, message in self.deltas if version > since]
+                return client, backlog
+        return client, [self.full_message()]
+    
+    def unsubscribe(self, client):
+        with self.lock:
+            self.clients.discard(client)
+
+device_tracker = DeviceTracker()
+
+# Sort orders for /api/devices - each key ends with the MAC so it is unique and usable as a cursor
+DEVICE_SORTS = {
+    'name': lambda d: (d['name'].lower(), d['mac']),
+    'signal': lambda d: (-d['signal_avg'], d['name'].lower(), d['mac']),
+    'band': lambda d: (d['frequency_band'], d['name'].lower(), d['mac'])
 }
+DEVICE_FILTERS = ('device_os', 'frequency_band', 'signal_quality', 'manufacturer')
+
+class DeviceIndex:
+    """Immutable secondary indexes over one device list, built once at ingest time"""
+    def __init__(self, device_list=()):
+        self.total = len(device_list)
+        self.orders = {}
+        self.members = {}
+        
+        for sort, key in DEVICE_SORTS.items():
+            ordered = sorted(device_list, key=key)
+            self.orders[(sort, None, None)] = ([key(d) for d in ordered], ordered)
+            
+            # Per filter value, a pre-sorted sublist so single-filter pages need no scan
+            for field in DEVICE_FILTERS:
+                buckets = {}
+                for device in ordered:
+                    buckets.setdefault(safe_lower(device.get(field)), []).append(device)
+                for value, bucket in buckets.items():
+                    self.orders[(sort, field, value)] = ([key(d) for d in bucket], bucket)
+        
+        self.labels = {}
+        for field in DEVICE_FILTERS:
+            for device in device_list:
+                value = safe_lower(device.get(field))
+                self.members.setdefault((field, value), set()).add(device['mac'])
+                self.labels.setdefault((field, value), safe_str(device.get(field)))
+    
+    def ordered(self, sort='name'):
+        return self.orders[(sort, None, None)][1]
+    
+    def facets(self):
+        """Count devices per filter value"""
+        facets = {field: {} for field in DEVICE_FILTERS}
+        for (field, value), macs in self.members.items():
+            facets[field][self.labels[(field, value)]] = len(macs)
+        return facets
+    
+    def query(self, sort='name', filters=None, limit=None, after=None):
+        """Return (page, total, next_key) for a sort order, filters and cursor key"""
+        filters = {field: safe_lower(value) for field, value in (filters or {}).items()}
+        
+        # Walk the smallest pre-sorted list and check any remaining filters inline
+        if filters:
+            candidates = [(sort, field, value) for field, value in filters.items()]
+            empty = ([], [])
+            keys, devices = min((self.orders.get(c, empty) for c in candidates), key=lambda o: len(o[1]))
+            total = len(set.intersection(*(self.members.get(f, set()) for f in filters.items())))
+        else:
+            keys, devices = self.orders[(sort, None, None)]
+            total = self.total
+        
+        start = bisect.bisect_right(keys, after) if after is not None else 0
+        page = []
+        next_key = None
+        for i in range(start, len(devices)):
+            device = devices[i]
+            if any(safe_lower(device.get(field)) != value for field, value in filters.items()):
+                continue
+            if limit is not None and len(page) == limit:
+                next_key = DEVICE_SORTS[sort](page[-1])
+                break
+            page.append(device)
+        return page, total, next_key
+
+device_index = DeviceIndex()
+
+# Field weights for search ranking - name matches beat address matches beat vendor matches
+SEARCH_WEIGHTS = {'name': 100, 'mac': 80, 'ip': 80, 'manufacturer': 40}
+MAC_SEPARATORS = re.compile(r'[:\-.\s]')
+WORD_SPLIT = re.compile(r'[^0-9a-z]+')
 
-def update_cache():
+def search_terms(device):
+    """Yield (term, field) pairs a device can be found by"""
+    name = safe_lower(device.get('name'))
+    yield name, 'name'
+    for word in WORD_SPLIT.split(name):
+        if word and word != name:
+            yield word, 'name'
+    
+    mac = safe_lower(device.get('mac'))
+    if mac and mac != 'n/a':
+        compact = MAC_SEPARATORS.sub('', mac)
+        yield compact, 'mac'
+        yield compact[6:], 'mac'  # Device-specific half, as printed on labels
+    
+    for ip in safe_str(device.get('ip')).split(', '):
+        if ip and ip != 'N/A':
+            yield ip, 'ip'
+            yield ip.rsplit('.', 1)[-1], 'ip'
+    
+    manufacturer = safe_lower(device.get('manufacturer'))
+    if manufacturer and manufacturer != 'unknown':
+        for word in WORD_SPLIT.split(manufacturer):
+            if word:
+                yield word, 'manufacturer'
+
+class DeviceSearchIndex:
+    """Prefix index over device names, IPs, MACs and manufacturers, updated per delta"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = []  # Sorted (term, mac, field) tuples
+        self.device_entries = {}
+        self.devices = {}
+    
+    def apply(self, joined, left, changed, devices):
+        """Apply a DeviceTracker delta; devices maps MAC to the current record"""
+        removed = set(left) | {change['mac'] for change in changed}
+        added = joined + [devices[change['mac']] for change in changed]
+        
+        with self.lock:
+            stale = set()
+            for mac in removed:
+                stale.update(self.device_entries.pop(mac, ()))
+                self.devices.pop(mac, None)
+            
+            fresh = []
+            for device in added:
+                entries = {(term, device['mac'], field) for term, field in search_terms(device) if term}
+                self.device_entries[device['mac']] = entries
+                self.devices[device['mac']] = device
+                fresh.extend(entries)
+            
+            # Small deltas are patched in place; large ones (e.g. first load) rebuild in one sort
+            if len(stale) + len(fresh) > SEARCH_REBUILD_THRESHOLD:
+                self.entries = sorted([e for e in self.entries if e not in stale] + fresh)
+            else:
+                for entry in stale:
+                    i = bisect.bisect_left(self.entries, entry)
+                    if i < len(self.entries) and self.entries[i] == entry:
+                        del self.entries[i]
+                for entry in fresh:
+                    bisect.insort(self.entries, entry)
+    
+    def _range(self, prefix):
+        """Index slice holding every term that starts with prefix"""
+        return (bisect.bisect_left(self.entries, (prefix,)),
+                bisect.bisect_left(self.entries, (prefix + '\uffff',)))
+    
+    @staticmethod
+    def _score(term, prefix, field):
+        return SEARCH_WEIGHTS[field] + (50 if term == prefix else 0) - min(len(term) - len(prefix), 20)
+    
+    def search(self, query, limit=10):
+        """Rank devices matching every word of the query"""
+        words = []
+        for word in query.lower().split():
+            # A MAC fragment may be typed with or without separators
+            compact = MAC_SEPARATORS.sub('', word)
+            if compact != word and compact and re.fullmatch(r'[0-9a-f]+', compact):
+                words.append((word, compact))
+            else:
+                words.append((word,))
+        if not words:
+            return []
+        
+        with self.lock:
+            # Scan the most selective word, then check the others per candidate
+            ranges = [[self._range(prefix) for prefix in prefixes] for prefixes in words]
+            first = min(range(len(words)), key=lambda w: sum(hi - lo for lo, hi in ranges[w]))
+            
+            scores = {}
+            budget = SEARCH_SCAN_MAX
+            for (lo, hi), prefix in zip(ranges[first], words[first]):
+                for term, mac, field in self.entries[lo:min(hi, lo + budget)]:
+                    score = self._score(term, prefix, field)
+                    if score > scores.get(mac, 0):
+                        scores[mac] = score
+                budget -= min(hi - lo, budget)
+            
+            for w, prefixes in enumerate(words):
+                if w == first:
+                    continue
+                for mac in list(scores):
+                    best = None
+                    for term, _, field in self.device_entries[mac]:
+                        for prefix in prefixes:
+                            if term.startswith(prefix):
+                                score = self._score(term, prefix, field)
+                                if best is None or score > best:
+                                    best = score
+                    if best is None:
+                        del scores[mac]
+                    else:
+                        scores[mac] += best
+            
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], self.devices[item[0]]['name'].lower()))
+            return [dict(self.devices[mac], score=score) for mac, score in ranked[:limit]]
+
+device_search = DeviceSearchIndex()
+
+def encode_cursor(sort, key):
+    """Encode a sort key as an opaque pagination cursor"""
+    return base64.urlsafe_b64encode(json.dumps([sort, key]).encode()).decode()
+
+def decode_cursor(cursor):
+    """Decode a pagination cursor back into (sort, key)"""
+    sort, key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return sort, tuple(key)
+
+def build_snapshot_event():
+    """Build the compact snapshot pushed to stream clients"""
+    return {
+        'last_update': data_cache['last_update'],
+        'connected_users': data_cache['connected_users'][-1:],
+        'signal_strength_avg': data_cache['signal_strength_avg'][-1:],
+        'device_os': data_cache['device_os'],
+        'frequency_distribution': data_cache['frequency_distribution'],
+        'device_count': len(data_cache['devices']),
+        'series_version': data_cache['series_version'],
+        'series_epoch': data_cache['series_epoch'],
+        'history_hours': history_hours()
+    }
+
+def build_speedtest_event():
+    """Build the speedtest status pushed to stream clients"""
+    return {
+        'running': data_cache['speedtest_running'],
+        'result': data_cache['speedtest_result'],
+        'job': speedtest_engine.latest(),
+        'queued': speedtest_engine.queued()
+    }
+
+def update_cache(max_age=None):
+    """Update data cache and notify stream clients of the new snapshot
+    
+    With max_age, skip the upstream fetch if another caller refreshed within
+    that many seconds - concurrent requests then share a single fetch.
+    """
+    global last_refresh
+    with cache_lock:
+        if max_age is not None and time.monotonic() - last_refresh < max_age:
+            UPDATE_CALLS.inc('coalesced')
+            return
+        UPDATE_CALLS.inc('fetched')
+        last_refresh = time.monotonic()
+        started = time.perf_counter()
+        with tracer.span('update_cache') as span:
+            updated = refresh_cache()
+            span.set(updated=updated)
+        UPDATE_SECONDS.observe(time.perf_counter() - started)
+        if updated:
+            touch_cache()
+    if updated:
+        event_broker.publish('snapshot', build_snapshot_event())
+
+def refresh_cache():
     """Update data cache with latest device information"""
-    global data_cache
+    global data_cache, device_index
     try:
-        all_devices = eero_api.get_all_devices()
+        with tracer.span('get_all_devices') as span:
+            all_devices = eero_api.get_all_devices()
+            span.set(devices=len(all_devices or []))
         if not all_devices:
             logging.warning("No devices returned from API")
-            return
+            return False
         
         # Filter for wireless connected devices
-        wireless_devices = [
-            device for device in all_devices 
-            if device.get('connected') and (
-                safe_lower(device.get('connection_type')) == 'wireless' or 
-                device.get('wireless')
-            )
-        ]
+        with tracer.span('filter_wireless', devices=len(all_devices)) as span:
+            wireless_devices = [
+                device for device in all_devices 
+                if device.get('connected') and (
+                    safe_lower(device.get('connection_type')) == 'wireless' or 
+                    device.get('wireless')
+                )
+            ]
+            span.set(wireless=len(wireless_devices))
         
         current_time = datetime.now()
+        seq = data_cache['series_version'] + 1
         
         # Update connected users over time
         data_cache['connected_users'].append({
             'timestamp': current_time.isoformat(),
-            'count': len(wireless_devices)
+            'count': len(wireless_devices),
+            'seq': seq
         })
         
-        # Keep only last 2 hours of data
-        two_hours_ago = current_time - timedelta(hours=2)
-        data_cache['connected_users'] = [
-            entry for entry in data_cache['connected_users']
-            if datetime.fromisoformat(entry['timestamp']) > two_hours_ago
-        ]
+        # Keep only the configured hours of history
+        with tracer.span('history_prune', points=len(data_cache['connected_users'])) as span:
+            cutoff = current_time - timedelta(hours=history_hours())
+            data_cache['connected_users'] = [
+                entry for entry in data_cache['connected_users']
+                if datetime.fromisoformat(entry['timestamp']) > cutoff
+            ]
+            span.set(kept=len(data_cache['connected_users']))
         
         # Initialize counters
-        device_os = {'iOS': 0, 'Android': 0, 'Windows': 0, 'Other': 0}
-        freq_distribution = {'2.4GHz': 0, '5GHz': 0, '6GHz': 0, 'Unknown': 0}
-        device_list = []
-        
-        # Process each wireless device
-        for device in wireless_devices:
-            # OS categorization
-            os_type = categorize_device_os(device)
-            device_os[os_type] += 1
-            
-            # Basic frequency analysis (simplified)
-            interface = device.get('interface', {}) or {}
-            freq = interface.get('frequency', 0)
-            if 2.4 <= freq < 2.5:
-                freq_distribution['2.4GHz'] += 1
-            elif 5.0 <= freq < 6.0:
-                freq_distribution['5GHz'] += 1
-            elif 6.0 <= freq < 7.0:
-                freq_distribution['6GHz'] += 1
-            else:
-                freq_distribution['Unknown'] += 1
-            
-            # Signal strength
-            connectivity = device.get('connectivity', {}) or {}
-            signal_dbm = connectivity.get('signal_avg')
-            score_bars = connectivity.get('score_bars', 0)
-            signal_percent = convert_signal_dbm_to_percent(signal_dbm)
-            
-            # Build device info
-            device_list.append({
-                'name': safe_str(
-                    device.get('nickname') or 
-                    device.get('hostname') or 
-                    device.get('display_name') or 
-                    'Unknown'
-                ),
-                'ip': ', '.join(device.get('ips', [])) if device.get('ips') else 'N/A',
-                'mac': safe_str(device.get('mac'), 'N/A'),
-                'manufacturer': safe_str(device.get('manufacturer'), 'Unknown'),
-                'signal_avg': signal_percent,
-                'signal_avg_dbm': f"{signal_dbm} dBm" if signal_dbm else 'N/A',
-                'score_bars': score_bars,
-                'signal_quality': get_signal_quality(score_bars),
-                'device_os': os_type,
-                'frequency': f"{freq} GHz" if freq else 'N/A',
-                'frequency_band': 'Unknown'
-            })
-        
+        with tracer.span('classify', devices=len(wireless_devices)):
+            device_os = {'iOS': 0, 'Android': 0, 'Windows': 0, 'Other': 0}
+            freq_distribution = {'2.4GHz': 0, '5GHz': 0, '6GHz': 0, 'Unknown': 0}
+            device_list = []
+
+            # Process each wireless device
+            for device in wireless_devices:
+                # OS categorization
+                os_type = categorize_device_os(device)
+                device_os[os_type] += 1
+
+                # Basic frequency analysis (simplified)
+                interface = device.get('interface', {}) or {}
+                freq = interface.get('frequency', 0)
+                if 2.4 <= freq < 2.5:
+                    band = '2.4GHz'
+                elif 5.0 <= freq < 6.0:
+                    band = '5GHz'
+                elif 6.0 <= freq < 7.0:
+                    band = '6GHz'
+                else:
+                    band = 'Unknown'
+                freq_distribution[band] += 1
+
+                # Signal strength
+                connectivity = device.get('connectivity', {}) or {}
+                signal_dbm = connectivity.get('signal_avg')
+                score_bars = connectivity.get('score_bars', 0)
+                signal_percent = convert_signal_dbm_to_percent(signal_dbm)
+
+                # Build device info
+                device_list.append({
+                    'name': safe_str(
+                        device.get('nickname') or 
+                        device.get('hostname') or 
+                        device.get('display_name') or 
+                        'Unknown'
+                    ),
+                    'ip': ', '.join(device.get('ips', [])) if device.get('ips') else 'N/A',
+                    'mac': safe_str(device.get('mac'), 'N/A'),
+                    'manufacturer': safe_str(device.get('manufacturer'), 'Unknown'),
+                    'signal_avg': signal_percent,
+                    'signal_avg_dbm': f"{signal_dbm} dBm" if signal_dbm else 'N/A',
+                    'score_bars': score_bars,
+                    'signal_quality': get_signal_quality(score_bars),
+                    'device_os': os_type,
+                    'frequency': f"{freq} GHz" if freq else 'N/A',
+                    'frequency_band': band
+                })
+
         # Update cache
         data_cache['device_os'] = device_os
         data_cache['frequency_distribution'] = freq_distribution
-        data_cache['devices'] = sorted(device_list, key=lambda x: x['name'].lower())
-        data_cache['signal_strength_avg'] = [{'timestamp': current_time.isoformat(), 'avg_dbm': -50}]
+        with tracer.span('sort_index', devices=len(device_list)):
+            device_index = DeviceIndex(device_list)
+            data_cache['devices'] = device_index.ordered('name')
+        with tracer.span('device_deltas') as span:
+            joined, left, changed = device_tracker.update(data_cache['devices'])
+            device_search.apply(joined, left, changed, device_tracker.devices)
+            span.set(joined=len(joined), left=len(left), changed=len(changed))
+        data_cache['signal_strength_avg'] = [{'timestamp': current_time.isoformat(), 'avg_dbm': -50, 'seq': seq}]
+        data_cache['series_version'] = seq
         data_cache['last_update'] = current_time.isoformat()
         
         logging.info(f"Cache updated: {len(wireless_devices)} wireless devices")
+        return True
         
     except Exception as e:
         logging.error(f"Cache update error: {e}")
+        return False
 
-def run_speedtest():
-    """Run speed test in background"""
-    global data_cache
-    try:
-        data_cache['speedtest_running'] = True
-        logging.info("Starting speedtest")
-        
-        st = speedtest.Speedtest()
-        st.get_best_server()
-        
-        data_cache['speedtest_result'] = {
-            'download': round(st.download() / 1_000_000, 2),
-            'upload': round(st.upload() / 1_000_000, 2),
-            'ping': round(st.results.ping, 2),
-            'timestamp': datetime.now().isoformat()
+class SpeedtestAborted(Exception):
+    """Raised inside a job when it was cancelled or ran out of time"""
+
+class SpeedtestJob:
+    """One speedtest run: state, current phase, live samples and result"""
+    def __init__(self, source='manual'):
+        self.id = uuid.uuid4().hex[:12]
+        self.source = source  # manual or schedule
+        self.state = 'queued'  # queued, running, complete, failed, cancelled, timeout
+        self.phase = None  # server, ping, download, upload while running
+        self.created = datetime.now().isoformat()
+        self.started = None
+        self.finished = None
+        self.deadline = None
+        self.mbps = None
+        self.samples = {'download': [], 'upload': []}
+        self.result = None
+        self.error = None
+        self.abort = threading.Event()
+        self.abort_state = None
+    
+    def to_dict(self, samples=False):
+        job = {
+            'id': self.id,
+            'source': self.source,
+            'state': self.state,
+            'phase': self.phase,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'mbps': self.mbps,
+            'result': self.result,
+            'error': self.error
+        }
+        if samples:
+            job['samples'] = self.samples
+        return job
+
+class SpeedtestEngine:
+    """Run speedtests one at a time from a bounded queue, with cancellation, timeout and history"""
+    def __init__(self, history_file=SPEEDTEST_HISTORY_FILE):
+        self.condition = threading.Condition()
+        self.queue = deque()
+        self.current = None
+        self.last = None
+        self.jobs = OrderedDict()  # Recent jobs by id, for status lookups
+        self.worker = None
+        self.history_file = history_file
+        self.history = deque(self.load_history(), maxlen=SPEEDTEST_HISTORY_MAX)
+        data_cache['speedtest_series'] = [self.series_point(job) for job in self.history if job['state'] == 'complete']
+    
+    def load_history(self):
+        try:
+            with open(self.history_file) as f:
+                return [json.loads(line) for line in f if line.strip()][-SPEEDTEST_HISTORY_MAX:]
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            logging.error(f"Error loading speedtest history: {e}")
+            return []
+    
+    @staticmethod
+    def series_point(job):
+        result = job['result']
+        return {
+            'timestamp': result.get('timestamp') or job['finished'],
+            'download': result['download'],
+            'upload': result['upload'],
+            'ping': result['ping'],
+            'source': job.get('source', 'manual')
+        }
+    
+    def submit(self, source='manual'):
+        """Queue a new job, None if the queue is full"""
+        with self.condition:
+            if len(self.queue) >= SPEEDTEST_QUEUE_MAX:
+                return None
+            job = SpeedtestJob(source)
+            self.queue.append(job)
+            self.jobs[job.id] = job
+            # Forget the oldest finished jobs only; queued and running ones must stay pollable
+            finished = [job_id for job_id, old in self.jobs.items() if old.state not in ('queued', 'running')]
+            for job_id in finished[:max(0, len(self.jobs) - (SPEEDTEST_QUEUE_MAX + 16))]:
+                del self.jobs[job_id]
+            if self.worker is None:
+                self.worker = threading.Thread(target=self.run_worker, daemon=True)
+                self.worker.start()
+            data_cache['speedtest_running'] = True
+            self.condition.notify()
+        logging.info(f"Speedtest {job.id} queued by {source} ({len(self.queue)} waiting)")
+        self.publish(touch=True)
+        return job
+    
+    def cancel(self, job_id):
+        """Cancel a queued or running job, False if it is unknown or already finished"""
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is None or job.state not in ('queued', 'running'):
+                return False
+            if job.state == 'running':
+                job.abort_state = 'cancelled'
+                job.abort.set()
+                return True
+            self.queue.remove(job)
+            self.finish(job, 'cancelled')
+        self.publish(touch=True)
+        return True
+    
+    def get(self, job_id):
+        with self.condition:
+            job = self.jobs.get(job_id)
+            return job.to_dict(samples=True) if job else None
+    
+    def latest(self):
+        """The running job, or the last one to finish"""
+        job = self.current or self.last
+        return job.to_dict() if job else None
+    
+    def queued(self):
+        return len(self.queue)
+    
+    def query_history(self, limit=20, since=None, state=None):
+        """Finished jobs, newest first"""
+        with self.condition:
+            jobs = list(self.history)
+        jobs = [job for job in reversed(jobs)
+                if (since is None or (job['created'] or '') >= since) and (state is None or job['state'] == state)]
+        return jobs[:limit]
+    
+    def publish(self, touch=False):
+        if touch:
+            touch_cache()
+        event_broker.publish('speedtest', build_speedtest_event())
+    
+    def finish(self, job, state, error=None):
+        """Record a job's final state and append it to the history (called under the condition)"""
+        job.state = state
+        job.error = error
+        job.phase = None
+        job.finished = datetime.now().isoformat()
+        if job.started:
+            duration = datetime.fromisoformat(job.finished) - datetime.fromisoformat(job.started)
+            SPEEDTEST_SECONDS.observe(duration.total_seconds(), state)
+        self.last = job
+        record = job.to_dict()
+        self.history.append(record)
+        try:
+            with open(self.history_file, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+            if len(self.history) == SPEEDTEST_HISTORY_MAX and os.path.getsize(self.history_file) > SPEEDTEST_HISTORY_MAX * 1024:
+                # Compact the file back down to what is kept in memory
+                with open(self.history_file + '.tmp', 'w') as f:
+                    f.writelines(json.dumps(entry) + '\n' for entry in self.history)
+                os.replace(self.history_file + '.tmp', self.history_file)
+        except Exception as e:
+            logging.error(f"Error saving speedtest history: {e}")
+        data_cache['speedtest_result'] = job.result if state == 'complete' else {'error': error or state}
+        if state == 'complete':
+            data_cache['speedtest_series'] = (data_cache['speedtest_series'] + [self.series_point(record)])[-SPEEDTEST_HISTORY_MAX:]
+        data_cache['speedtest_running'] = bool(self.queue) or self.current not in (None, job)
+        logging.info(f"Speedtest {job.id} {state}" + (f": {error}" if error else ''))
+    
+    def run_worker(self):
+        while True:
+            with self.condition:
+                while not self.queue:
+                    self.condition.wait()
+                job = self.current = self.queue.popleft()
+                job.state = 'running'
+                job.started = datetime.now().isoformat()
+                job.deadline = time.time() + SPEEDTEST_TIMEOUT
+            self.publish(touch=True)
+            
+            state, error = 'complete', None
+            try:
+                self.execute(job)
+            except SpeedtestAborted:
+                state = job.abort_state
+            except Exception as e:
+                state, error = 'failed', str(e)
+            
+            with self.condition:
+                self.finish(job, state, error)
+                self.current = None
+            self.publish(touch=True)
+    
+    def execute(self, job):
+        """Run the speedtest in a worker process, relaying its phases and samples
+
+        The worker runs niced, pinned to the last CPU and memory capped so the
+        web process stays responsive; cancel and timeout kill it outright. It
+        reuses the server chosen by earlier runs for SPEEDTEST_SERVER_TTL.
+        """
+        cpus = os.cpu_count() or 1
+        options = {
+            'nice': SPEEDTEST_NICE,
+            'cpus': [cpus - 1] if cpus > 1 else None,
+            'memory_mb': SPEEDTEST_MEMORY_MB,
+            'cpu_seconds': SPEEDTEST_TIMEOUT,
+            'sample_interval': SPEEDTEST_SAMPLE_INTERVAL,
+            'server_cache': SPEEDTEST_SERVER_CACHE,
+            'server_ttl': SPEEDTEST_SERVER_TTL
         }
+        worker = subprocess.Popen(
+            [sys.executable, SPEEDTEST_WORKER, json.dumps(options)],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+            env=dict(os.environ, MALLOC_ARENA_MAX='2')  # glibc reads this at startup, keep arenas few
+        )
         
-        logging.info(f"Speedtest complete: {data_cache['speedtest_result']}")
+        def watchdog():
+            # Kill the worker on cancel or once the deadline passes
+            if not job.abort.wait(max(0, job.deadline - time.time())):
+                job.abort_state = 'timeout'
+                job.abort.set()
+            if worker.poll() is None:
+                worker.terminate()
+                try:
+                    worker.wait(SPEEDTEST_KILL_GRACE)
+                except subprocess.TimeoutExpired:
+                    worker.kill()
         
-    except Exception as e:
-        logging.error(f"Speedtest error: {e}")
-        data_cache['speedtest_result'] = {'error': str(e)}
-    finally:
-        data_cache['speedtest_running'] = False
+        threading.Thread(target=watchdog, daemon=True).start()
+        error = None
+        try:
+            for line in worker.stdout:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue  # Partial line from a killed worker
+                if message['event'] == 'phase':
+                    job.phase, job.mbps = message['phase'], None
+                elif message['event'] == 'sample':
+                    job.mbps = message['mbps']
+                    job.samples[message['phase']].append([message['elapsed'], message['mbps']])
+                elif message['event'] == 'result':
+                    job.result = message['result']
+                elif message['event'] == 'error':
+                    error = message['error']
+                self.publish()
+            worker.wait()
+        finally:
+            aborted = job.abort_state is not None
+            job.abort.set()  # Stops the watchdog
+        
+        if aborted:
+            raise SpeedtestAborted()
+        if job.result is None:
+            raise RuntimeError(error or f"Speedtest worker exited with code {worker.returncode}")
+
+speedtest_engine = SpeedtestEngine()
+
+def in_off_peak(hour, start, end):
+    if start == end:
+        return True
+    return start <= hour < end if start < end else hour >= start or hour < end
+
+def next_scheduled_run(schedule, last, now):
+    """When the next scheduled speedtest should start
+
+    At least interval_hours after the last scheduled run, moved forward to the
+    start of the off-peak window if it falls outside it, plus random jitter.
+    """
+    due = datetime.fromtimestamp(max(now, last + max(1, schedule['interval_hours']) * 3600))
+    start, end = schedule['off_peak_hours']
+    if not in_off_peak(due.hour, start, end):
+        window = due.replace(hour=start, minute=0, second=0, microsecond=0)
+        due = window if window > due else window + timedelta(days=1)
+    return due.timestamp() + random.uniform(0, schedule['jitter_minutes'] * 60)
+
+def speedtest_schedule_loop():
+    """Queue speedtests on the speedtest_schedule config, re-read while waiting"""
+    scheduled = [job['created'] for job in speedtest_engine.history if job.get('source') == 'schedule']
+    last = datetime.fromisoformat(scheduled[-1]).timestamp() if scheduled else 0
+    planned, due = None, None
+    while True:
+        schedule = {**SPEEDTEST_SCHEDULE, **config_service.get('speedtest_schedule', {})}
+        if schedule != planned:
+            planned = schedule
+            due = next_scheduled_run(schedule, last, time.time()) if schedule['enabled'] else None
+            if due:
+                logging.info(f"Next scheduled speedtest at {datetime.fromtimestamp(due).isoformat(timespec='minutes')}")
+        if due is None:
+            time.sleep(SPEEDTEST_SCHEDULE_POLL)
+            continue
+        if time.time() < due:
+            time.sleep(min(SPEEDTEST_SCHEDULE_POLL, due - time.time()))
+            continue
+        last, planned = time.time(), None
+        if speedtest_engine.submit('schedule') is None:
+            logging.warning("Skipped scheduled speedtest - queue is full")
+
+def percentile(values, p):
+    """Nearest-rank percentile of sorted values, None if there are none"""
+    if not values:
+        return None
+    return round(values[max(0, math.ceil(len(values) * p / 100) - 1)], 1)
+
+def summarize_probes(samples):
+    """Latency percentiles (ms) and loss (%) for a list of probe results, None meaning lost"""
+    ok = sorted(ms for ms in samples if ms is not None)
+    return {
+        'p50': percentile(ok, 50),
+        'p95': percentile(ok, 95),
+        'loss': round(100 * (len(samples) - len(ok)) / len(samples), 1),
+        'sent': len(samples)
+    }
+
+class LatencyProber:
+    """Time small TCP connect, DNS and HTTP HEAD probes and keep a bounded latency/loss series
+    
+    Each round probes every target once; every PROBE_BUCKET seconds the
+    round results are summarized into one point per target plus an overall
+    one, appended to data_cache['latency'] and pushed to stream clients.
+    Nothing is probed while the latency_probes config entry is disabled.
+    """
+    def __init__(self):
+        self.pending = {}  # Target name -> probe results in the current bucket
+        self.bucket_started = time.time()
+        self.invalid = set()  # Misconfigured targets already logged
+        self.ssl_context = None
+    
+    def targets(self):
+        return config_service.get('probe_targets', PROBE_TARGETS)
+    
+    @staticmethod
+    def enabled():
+        return {**LATENCY_PROBES, **(config_service.get('latency_probes') or {})}['enabled']
+    
+    @staticmethod
+    def address(target):
+        if target['type'] == 'tcp':
+            return f"{target['host']}:{target['port']}"
+        if target['type'] == 'dns':
+            return f"{target['host']} ({target.get('query', 'google.com')})"
+        return target['url']
+    
+    def probe(self, target):
+        """Round trip time in ms, raising OSError/HTTPException if the probe is lost"""
+        started = time.perf_counter()
+        if target['type'] == 'tcp':
+            socket.create_connection((target['host'], target['port']), PROBE_TIMEOUT).close()
+        elif target['type'] == 'dns':
+            self.probe_dns(target['host'], target.get('query', 'google.com'))
+        elif target['type'] == 'http':
+            self.probe_http(target['url'])
+        else:
+            raise ValueError(f"unknown probe type {target['type']!r}")
+        return round((time.perf_counter() - started) * 1000, 2)
+    
+    def probe_dns(self, server, name):
+        """Send one A query over UDP and wait for the matching reply"""
+        query_id = random.getrandbits(16)
+        question = b''.join(bytes([len(label)]) + label.encode() for label in name.strip('.').split('.'))
+        packet = struct.pack('>HHHHHH', query_id, 0x0100, 1, 0, 0, 0) + question + b'\x00' + struct.pack('>HH', 1, 1)
+        with socket.socket(socket.AF_INET6 if ':' in server else socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.settimeout(PROBE_TIMEOUT)
+            sock.connect((server, 53))
+            sock.send(packet)
+            while len(reply := sock.recv(512)) < 2 or struct.unpack('>H', reply[:2])[0] != query_id:
+                pass  # Stray reply to an earlier, timed out query
+    
+    def probe_http(self, url):
+        """HEAD request on a fresh connection, timed to the response headers"""
+        parts = urlsplit(url)
+        if parts.scheme == 'https':
+            if self.ssl_context is None:
+                self.ssl_context = ssl.create_default_context()
+            conn = http.client.HTTPSConnection(parts.hostname, parts.port, timeout=PROBE_TIMEOUT, context=self.ssl_context)
+        else:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=PROBE_TIMEOUT)
+        try:
+            conn.request('HEAD', (parts.path or '/') + (f"?{parts.query}" if parts.query else ''))
+            conn.getresponse()
+        finally:
+            conn.close()
+    
+    def probe_round(self):
+        for target in self.targets():
+            name = target.get('name') or str(target)
+            try:
+                ms = self.probe(target)
+            except (OSError, http.client.HTTPException):
+                ms = None
+            except Exception as e:
+                if name not in self.invalid:
+                    self.invalid.add(name)
+                    logging.error(f"Skipping latency probe {name}: {e}")
+                continue
+            self.pending.setdefault(name, []).append(ms)
+        if time.time() - self.bucket_started >= PROBE_BUCKET:
+            self.close_bucket()
+    
+    def close_bucket(self):
+        pending, self.pending = self.pending, {}
+        self.bucket_started = time.time()
+        if not pending:
+            return
+        point = summarize_probes([ms for samples in pending.values() for ms in samples])
+        point['timestamp'] = datetime.now().isoformat()
+        point['targets'] = {name: summarize_probes(samples) for name, samples in pending.items()}
+        data_cache['latency'] = (data_cache['latency'] + [point])[-PROBE_HISTORY_MAX:]
+        touch_cache()
+        event_broker.publish('latency', point)
+    
+    def build(self, limit):
+        return {
+            'enabled': self.enabled(),
+            'interval': PROBE_INTERVAL,
+            'bucket': PROBE_BUCKET,
+            'targets': [{'name': t.get('name'), 'type': t.get('type'), 'address': self.address(t)}
+                        for t in self.targets() if t.get('name') not in self.invalid],
+            'series': data_cache['latency'][-limit:]
+        }
+    
+    def run(self):
+        while True:
+            started = time.monotonic()
+            if not self.enabled():
+                # Drop the partial bucket so re-enabling starts a clean one
+                self.pending, self.bucket_started = {}, time.time()
+            else:
+                try:
+                    self.probe_round()
+                except Exception as e:
+                    logging.error(f"Latency probe error: {e}")
+            time.sleep(max(0, PROBE_INTERVAL - (time.monotonic() - started)))
+
+latency_prober = LatencyProber()
+
+def refresh_loop():
+    """Refresh the cache in the background so stream clients get new snapshots"""
+    while True:
+        time.sleep(refresh_interval())
+        try:
+            update_cache()
+        except Exception as e:
+            logging.error(f"Background refresh error: {e}")
 
 # API Routes
-@app.route('/')
-def index():
-    """Serve main page"""
-    return '''<!DOCTYPE html>
+INDEX_HTML = '''<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
@@ -465,6 +1801,7 @@ def index():
         </div>
     </div>
     
+    <script id="initial-snapshot" type="application/json">__INITIAL_SNAPSHOT__</script>
     <script>
         function showAlert(message, type = 'success') {
             const alerts = document.getElementById('alerts');
@@ -624,77 +1961,470 @@ def index():
         async function loadDashboard() {
             try {
                 const [dashboardResponse, versionResponse] = await Promise.all([
-                    fetch('/api/dashboard'),
+                    fetch('/api/dashboard/summary'),
                     fetch('/api/version')
                 ]);
                 
-                const dashboardData = await dashboardResponse.json();
-                const versionData = await versionResponse.json();
-                
-                document.getElementById('deviceCount').textContent = 
-                    dashboardData.connected_users[0]?.count || 0;
-                document.getElementById('lastUpdate').textContent = 
-                    new Date(dashboardData.last_update).toLocaleTimeString();
-                document.getElementById('version').textContent = versionData.version;
-                document.getElementById('networkId').textContent = versionData.network_id;
-                
+                renderDashboard(await dashboardResponse.json(), await versionResponse.json());
             } catch (error) {
                 console.error('Dashboard load error:', error);
             }
         }
         
+        function renderDashboard(summary, versionData) {
+            document.getElementById('deviceCount').textContent = summary.connected || 0;
+            if (summary.last_update) {
+                document.getElementById('lastUpdate').textContent = 
+                    new Date(summary.last_update).toLocaleTimeString();
+            }
+            document.getElementById('version').textContent = versionData.version;
+            document.getElementById('networkId').textContent = versionData.network_id;
+        }
+        
+        function readInitialSnapshot() {
+            // Snapshot inlined by the server so the first frame needs no round trip
+            try {
+                return JSON.parse(document.getElementById('initial-snapshot').textContent);
+            } catch (error) {
+                return null;
+            }
+        }
+        
+        function connectStream() {
+            if (!window.EventSource) {
+                return false;
+            }
+            
+            const source = new EventSource('/api/stream');
+            source.addEventListener('snapshot', event => {
+                const snapshot = JSON.parse(event.data);
+                if (snapshot.last_update) {
+                    document.getElementById('deviceCount').textContent = snapshot.device_count;
+                    document.getElementById('lastUpdate').textContent = 
+                        new Date(snapshot.last_update).toLocaleTimeString();
+                }
+            });
+            source.addEventListener('admin', () => loadDashboard());
+            source.onerror = () => {
+                // Endpoint unavailable - fall back to polling
+                if (source.readyState === EventSource.CLOSED) {
+                    setInterval(loadDashboard, 60000);
+                }
+            };
+            return true;
+        }
+        
         // Initialize
         window.addEventListener('load', () => {
-            loadDashboard();
-            setInterval(loadDashboard, 60000); // Refresh every minute
+            const initial = readInitialSnapshot();
+            if (initial && initial.summary.last_update) {
+                renderDashboard(initial.summary, initial.version);
+            } else {
+                loadDashboard();
+            }
+            if (!connectStream()) {
+                setInterval(loadDashboard, 60000); // Refresh every minute
+            }
         });
     </script>
 </body>
 </html>'''
 
+def inline_snapshot(snapshot):
+    """Snapshot as JSON that is safe inside a script element"""
+    # Escape '<' so the JSON can never close the script element
+    return json.dumps(snapshot, separators=(',', ':')).replace('<', '\\u003c')
+
+def render_index(snapshot):
+    """Main page with the snapshot inlined as a JSON script block"""
+    return INDEX_HTML.replace('__INITIAL_SNAPSHOT__', inline_snapshot(snapshot)).encode()
+
+def render_chart_page(snapshot):
+    """frontend/index.html with the snapshot filled into its initial-snapshot block"""
+    path = next(path for path in CHART_PAGES if os.path.isfile(path))
+    with open(path, 'r') as f:
+        page = f.read()
+    block = CHART_PAGE_PLACEHOLDER.replace('>null<', f'>{inline_snapshot(snapshot)}<')
+    return page.replace(CHART_PAGE_PLACEHOLDER, block).encode()
+
+def build_initial_snapshot():
+    """Data embedded in the served pages for the first frame
+
+    'dashboard' carries the chart fields the chart page (frontend/index.html,
+    served at /charts) renders from its initial-snapshot block.
+    """
+    return {
+        'summary': build_summary(),
+        'version': build_version_info(),
+        'dashboard': {field: data_cache[field] for field in INITIAL_DASHBOARD_FIELDS}
+    }
+
+@app.route('/')
+def index():
+    """Serve main page, re-rendered whenever the cache version changes"""
+    return cached_response('index', build_initial_snapshot, render_index, 'text/html')
+
+@app.route('/charts')
+def chart_page():
+    """Serve the full chart page, with the snapshot inlined like the main page"""
+    if not any(os.path.isfile(path) for path in CHART_PAGES):
+        return jsonify({'error': 'Chart page not installed'}), 404
+    return cached_response('charts', build_initial_snapshot, render_chart_page, 'text/html')
+
+def build_summary():
+    """Counts and latest values for the main view, without history or devices"""
+    users = data_cache['connected_users']
+    signal = data_cache['signal_strength_avg']
+    return {
+        'version': data_cache['version'],
+        'last_update': data_cache['last_update'],
+        'connected': users[-1]['count'] if users else 0,
+        'avg_dbm': signal[-1]['avg_dbm'] if signal else None,
+        'device_count': len(data_cache['devices']),
+        'device_os': data_cache['device_os'],
+        'frequency_distribution': data_cache['frequency_distribution'],
+        'speedtest_running': data_cache['speedtest_running'],
+        'history_hours': history_hours()
+    }
+
+def build_series(since=None, epoch=None):
+    """History series for the line charts, only the points after seq since when possible
+    
+    'reset' tells the client to replace its series rather than append, which
+    happens without since, after a restart, or when points past since were
+    already trimmed from the history.
+    """
+    version = data_cache['series_version']
+    users = data_cache['connected_users']
+    oldest = users[0]['seq'] if users else version + 1
+    reset = since is None or epoch != data_cache['series_epoch'] or not oldest - 1 <= since <= version
+    if reset:
+        since = 0
+    return {
+        'version': data_cache['version'],
+        'last_update': data_cache['last_update'],
+        'series_version': version,
+        'series_epoch': data_cache['series_epoch'],
+        'history_hours': history_hours(),
+        'reset': reset,
+        'connected_users': [point for point in users if point['seq'] > since],
+        'signal_strength_avg': [point for point in data_cache['signal_strength_avg'] if point['seq'] > since]
+    }
+
+# Server-side chart renders for displays that can't run the frontend
+RENDER_THEMES = {
+    'dark': {'background': '#001a33', 'text': '#ffffff', 'grid': 'rgba(255,255,255,0.2)',
+             'palette': ['#4da6ff', '#51cf66', '#74c0fc', '#ffd43b', '#ff922b', '#b197fc']},
+    'light': {'background': '#ffffff', 'text': '#000000', 'grid': '#999999',
+              'palette': ['#000000', '#555555', '#888888', '#bbbbbb']}  # e-ink friendly
+}
+RENDER_CHARTS = {
+    'users': {'title': 'Connected Users', 'kind': 'line', 'field': 'connected_users', 'value': 'count', 'color': 0},
+    'signal': {'title': 'Average Signal (dBm)', 'kind': 'line', 'field': 'signal_strength_avg', 'value': 'avg_dbm', 'color': 1},
+    'device-os': {'title': 'Device OS', 'kind': 'bar', 'field': 'device_os'},
+    'frequency': {'title': 'Frequency Bands', 'kind': 'bar', 'field': 'frequency_distribution'},
+    'latency': {'title': 'WAN Latency p50 (ms)', 'kind': 'line', 'field': 'latency', 'value': 'p50', 'color': 2}
+}
+
+def svg_text(x, y, text, theme, size=12, anchor='start', weight='normal'):
+    return (f'<text x="{x:.1f}" y="{y:.1f}" fill="{theme["text"]}" font-size="{size}" '
+            f'font-weight="{weight}" text-anchor="{anchor}">{html.escape(str(text))}</text>')
+
+def format_time(timestamp):
+    try:
+        return datetime.fromisoformat(timestamp).strftime('%H:%M')
+    except (TypeError, ValueError):
+        return ''
+
+def render_line_chart(chart, width, height, theme):
+    """SVG elements for a history series, one polyline scaled to the plot area"""
+    points = [p for p in data_cache[chart['field']] if p.get(chart['value']) is not None]
+    left, right, top, bottom = 44, 12, 40, 24
+    plot_w, plot_h = width - left - right, height - top - bottom
+    elements = []
+    if not points:
+        elements.append(svg_text(width / 2, top + plot_h / 2, 'No data yet', theme, 14, 'middle'))
+        return elements
+    
+    values = [p[chart['value']] for p in points]
+    low, high = min(values), max(values)
+    if high == low:
+        low, high = low - 1, high + 1
+    step = plot_w / max(len(values) - 1, 1)
+    coords = ' '.join(
+        f"{left + i * step:.1f},{top + plot_h - (v - low) / (high - low) * plot_h:.1f}"
+        for i, v in enumerate(values)
+    )
+    color = theme['palette'][chart['color'] % len(theme['palette'])]
+    elements.append(f'<line x1="{left}" y1="{top}" x2="{left}" y2="{top + plot_h}" stroke="{theme["grid"]}"/>')
+    elements.append(f'<line x1="{left}" y1="{top + plot_h}" x2="{left + plot_w}" y2="{top + plot_h}" stroke="{theme["grid"]}"/>')
+    elements.append(f'<polyline points="{coords}" fill="none" stroke="{color}" stroke-width="2" stroke-linejoin="round"/>')
+    elements.append(svg_text(left - 6, top + 4, f"{high:g}", theme, 11, 'end'))
+    elements.append(svg_text(left - 6, top + plot_h, f"{low:g}", theme, 11, 'end'))
+    elements.append(svg_text(left, height - 6, format_time(points[0].get('timestamp')), theme, 11))
+    elements.append(svg_text(left + plot_w, height - 6, format_time(points[-1].get('timestamp')), theme, 11, 'end'))
+    elements.append(svg_text(width - right, 24, f"Now: {values[-1]:g}", theme, 14, 'end', 'bold'))
+    return elements
+
+def render_bar_chart(chart, width, height, theme):
+    """SVG elements for a distribution, one labelled horizontal bar per category"""
+    counts = sorted(((k, v) for k, v in data_cache[chart['field']].items() if v), key=lambda item: -item[1])
+    left, right, top, bottom = 96, 48, 40, 12
+    plot_w, plot_h = width - left - right, height - top - bottom
+    elements = []
+    if not counts:
+        elements.append(svg_text(width / 2, top + plot_h / 2, 'No data yet', theme, 14, 'middle'))
+        return elements
+    
+    largest = counts[0][1]
+    row = plot_h / len(counts)
+    bar = min(row * 0.7, 32)
+    palette = theme['palette']
+    for i, (label, count) in enumerate(counts):
+        y = top + i * row + (row - bar) / 2
+        length = max(count / largest * plot_w, 1)
+        elements.append(f'<rect x="{left}" y="{y:.1f}" width="{length:.1f}" height="{bar:.1f}" fill="{palette[i % len(palette)]}"/>')
+        elements.append(svg_text(left - 8, y + bar / 2 + 4, label, theme, 12, 'end'))
+        elements.append(svg_text(left + length + 6, y + bar / 2 + 4, count, theme, 12))
+    return elements
+
+def render_chart_svg(name, width, height, theme_name):
+    """Standalone SVG document for one dashboard chart from the current cache"""
+    chart = RENDER_CHARTS[name]
+    theme = RENDER_THEMES[theme_name]
+    draw = render_line_chart if chart['kind'] == 'line' else render_bar_chart
+    elements = [
+        f'<rect width="{width}" height="{height}" fill="{theme["background"]}"/>',
+        svg_text(12, 24, chart['title'], theme, 16, weight='bold')
+    ] + draw(chart, width, height, theme)
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}" font-family="sans-serif">' + ''.join(elements) + '</svg>').encode()
+
 @app.route('/api/dashboard')
 def get_dashboard_data():
-    """Get dashboard data"""
-    update_cache()
-    return jsonify(data_cache)
+    """Get dashboard data, optionally only the fields listed in ?fields="""
+    update_cache(max_age=refresh_interval())
+    
+    fields = request.args.get('fields')
+    if not fields:
+        return cached_response('dashboard', lambda: data_cache)
+    
+    selected = sorted({f.strip() for f in fields.split(',') if f.strip()})
+    unknown = [f for f in selected if f not in data_cache]
+    if unknown:
+        return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+    return cached_response('dashboard:' + ','.join(selected), lambda: {f: data_cache[f] for f in selected})
+
+@app.route('/api/dashboard/summary')
+def get_dashboard_summary():
+    """Get the tiny summary payload"""
+    update_cache(max_age=refresh_interval())
+    return cached_response('summary', build_summary)
+
+@app.route('/api/dashboard/series')
+def get_dashboard_series():
+    """Get the history series, or with ?since=&epoch= only the points added since"""
+    update_cache(max_age=refresh_interval())
+    since = request.args.get('since', type=int)
+    epoch = request.args.get('epoch', type=int)
+    return cached_response(f"series:{since}:{epoch}", lambda: build_series(since, epoch))
+
+@app.route('/api/render/<chart>.<fmt>')
+def render_chart(chart, fmt):
+    """Render a chart as SVG or PNG, cached per cache version, size and theme"""
+    if chart not in RENDER_CHARTS:
+        return jsonify({'error': f'Unknown chart: {chart}'}), 404
+    if fmt not in ('svg', 'png'):
+        return jsonify({'error': f'Unsupported format: {fmt}'}), 404
+    if fmt == 'png' and cairosvg is None:
+        return jsonify({'error': 'PNG rendering unavailable, install cairosvg'}), 501
+    theme = request.args.get('theme', 'dark')
+    if theme not in RENDER_THEMES:
+        return jsonify({'error': f'Unknown theme: {theme}'}), 400
+    
+    # Clamp sizes so arbitrary values can't flood the response cache with huge renders
+    width = max(RENDER_SIZE_MIN[0], min(request.args.get('width', RENDER_SIZE_DEFAULT[0], type=int), RENDER_SIZE_MAX[0]))
+    height = max(RENDER_SIZE_MIN[1], min(request.args.get('height', RENDER_SIZE_DEFAULT[1], type=int), RENDER_SIZE_MAX[1]))
+    update_cache(max_age=refresh_interval())
+    
+    key = f"render:{chart}:{width}x{height}:{theme}.{fmt}"
+    build = lambda: render_chart_svg(chart, width, height, theme)
+    if fmt == 'svg':
+        return cached_response(key, build, bytes, 'image/svg+xml')
+    return cached_response(key, build, lambda svg: cairosvg.svg2png(bytestring=svg), 'image/png')
 
 @app.route('/api/devices')
 def get_devices():
-    """Get device list"""
-    return jsonify({
-        'devices': data_cache.get('devices', []),
-        'count': len(data_cache.get('devices', []))
+    """Get device list, optionally paginated, filtered and sorted"""
+    index = device_index
+    sort = request.args.get('sort', 'name')
+    if sort not in DEVICE_SORTS:
+        return jsonify({'error': f'Invalid sort: {sort}'}), 400
+    
+    limit = request.args.get('limit', type=int)
+    if limit is not None:
+        limit = max(1, min(limit, DEVICE_PAGE_MAX))
+    
+    after = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            cursor_sort, after = decode_cursor(cursor)
+        except Exception:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        if cursor_sort != sort:
+            return jsonify({'error': 'Cursor does not match sort'}), 400
+    
+    filters = {field: request.args[field] for field in DEVICE_FILTERS if request.args.get(field)}
+    facets = bool(request.args.get('facets'))
+    
+    def build():
+        devices, total, next_key = index.query(sort, filters, limit, after)
+        response = {
+            'devices': devices,
+            'count': len(devices),
+            'total': total,
+            'next_cursor': encode_cursor(sort, next_key) if next_key is not None else None
+        }
+        if facets:
+            response['facets'] = index.facets()
+        return response
+    
+    return cached_response('devices:' + request.query_string.decode(), build)
+
+@app.route('/api/devices/search')
+def search_devices():
+    """Typeahead search over device name, IP, MAC and manufacturer"""
+    query = request.args.get('q', '').strip()
+    limit = max(1, min(request.args.get('limit', 10, type=int), SEARCH_LIMIT_MAX))
+    results = device_search.search(query, limit)
+    return jsonify({'query': query, 'results': results, 'count': len(results)})
+
+@app.route('/api/stream')
+def stream():
+    """Push snapshot, speedtest and admin events as Server-Sent Events"""
+    client = event_broker.subscribe()
+    
+    def generate():
+        try:
+            yield 'retry: 5000\n\n'
+            yield format_sse('snapshot', build_snapshot_event())
+            yield format_sse('speedtest', build_speedtest_event())
+            while True:
+                event = client.get(STREAM_HEARTBEAT)
+                yield event if event is not None else ': heartbeat\n\n'
+        finally:
+            event_broker.unsubscribe(client)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
     })
 
+def devices_socket(ws):
+    """Send the device list once, then only versioned deltas keyed by MAC"""
+    since = request.args.get('since', type=int)
+    epoch = request.args.get('epoch', type=int)
+    client, backlog = device_tracker.subscribe(since, epoch)
+    try:
+        for message in backlog:
+            ws.send(message)
+        while True:
+            message = client.get(STREAM_HEARTBEAT)
+            if client.dropped:
+                # Client fell behind and lost deltas - resync with the full list
+                client.reset()
+                ws.send(device_tracker.full_message())
+            elif message is not None:
+                ws.send(message)
+    finally:
+        device_tracker.unsubscribe(client)
+
+if sock:
+    sock.route('/api/devices/ws')(devices_socket)
+else:
+    logging.warning("flask-sock not installed - /api/devices/ws disabled")
+
 @app.route('/api/speedtest/start', methods=['POST'])
 def start_speedtest():
-    """Start speed test"""
-    if data_cache['speedtest_running']:
-        return jsonify({'status': 'running'}), 409
-    
-    threading.Thread(target=run_speedtest, daemon=True).start()
-    return jsonify({'status': 'started'})
+    """Queue a speed test job"""
+    job = speedtest_engine.submit()
+    if job is None:
+        return jsonify({'status': 'busy', 'message': 'Speedtest queue is full'}), 409
+    return jsonify({'status': job.state, 'job': job.to_dict()})
 
 @app.route('/api/speedtest/status')
 def get_speedtest_status():
     """Get speed test status"""
-    return jsonify({
-        'running': data_cache['speedtest_running'],
-        'result': data_cache['speedtest_result']
-    })
+    return jsonify(build_speedtest_event())
+
+@app.route('/api/speedtest/jobs/<job_id>')
+def get_speedtest_job(job_id):
+    """Get one speed test job with its throughput samples"""
+    job = speedtest_engine.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job)
+
+@app.route('/api/speedtest/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_speedtest_job(job_id):
+    """Cancel a queued or running speed test"""
+    if not speedtest_engine.cancel(job_id):
+        return jsonify({'success': False, 'message': 'Job is not queued or running'}), 409
+    return jsonify({'success': True, 'message': 'Speedtest cancelled'})
+
+@app.route('/api/speedtest/history')
+def get_speedtest_history():
+    """Finished speed tests, newest first, optionally ?since=<ISO time>&state="""
+    limit = max(1, min(request.args.get('limit', 20, type=int), SPEEDTEST_HISTORY_MAX))
+    jobs = speedtest_engine.query_history(limit, request.args.get('since'), request.args.get('state'))
+    return jsonify({'jobs': jobs, 'count': len(jobs)})
+
+@app.route('/api/latency')
+def get_latency():
+    """Probe targets and the latency/loss series, the newest ?limit= points"""
+    limit = max(1, min(request.args.get('limit', PROBE_HISTORY_MAX, type=int), PROBE_HISTORY_MAX))
+    return cached_response(f"latency:{limit}", lambda: latency_prober.build(limit))
+
+@app.route('/metrics')
+def get_metrics():
+    """Prometheus text exposition of the backend metrics"""
+    lines = [line for metric in metrics for line in metric.render()]
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
 
 @app.route('/api/version')
 def get_version():
     """Get version information"""
-    config = load_config()
-    
-    return jsonify({
+    return jsonify(build_version_info())
+
+def build_version_info():
+    return {
         'version': CURRENT_VERSION,
         'name': 'Eero Dashboard (GitHub)',
-        'network_id': config.get('network_id', '20478317'),
-        'environment': config.get('environment', 'production'),
-        'api_url': config.get('api_url', 'api-user.e2ro.com')
-    })
+        'network_id': config_service.get('network_id', '20478317'),
+        'environment': config_service.get('environment', 'production'),
+        'api_url': get_api_url(),
+        'render_profile': config_service.get('render_profile', 'standard')
+    }
+
+def publish_config_change(config, changed):
+    """Config subscriber - rebuild cached responses and tell screens what changed"""
+    touch_cache()
+    for key in ('network_id', 'render_profile'):
+        if key in changed:
+            event_broker.publish('admin', {'action': key, key: config.get(key)})
+    if 'history_hours' in changed:
+        # Screens reload their charts when the snapshot carries a new window
+        event_broker.publish('snapshot', build_snapshot_event())
+
+config_service.subscribe(publish_config_change)
+
+@app.route('/api/admin/traces')
+def get_traces():
+    """Recent refresh traces, newest first, optionally ?limit=&min_ms=&name="""
+    limit = max(1, min(request.args.get('limit', 20, type=int), TRACE_BUFFER_SIZE))
+    traces = tracer.query(limit, request.args.get('min_ms', 0, type=float), request.args.get('name'))
+    return jsonify({'enabled': tracer.settings()['enabled'], 'traces': traces, 'count': len(traces)})
 
 @app.route('/api/admin/network-id', methods=['POST'])
 def change_network_id():
@@ -711,7 +2441,6 @@ def change_network_id():
         config['last_updated'] = datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
         
         if save_config(config):
-            eero_api.reload_network_id()
             return jsonify({'success': True, 'message': f'Network ID updated to {new_id}'})
         
         return jsonify({'success': False, 'message': 'Failed to save configuration'}), 500
@@ -719,6 +2448,27 @@ def change_network_id():
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@app.route('/api/admin/render-profile', methods=['POST'])
+def change_render_profile():
+    """Select the chart render profile used by every screen"""
+    try:
+        data = request.get_json()
+        profile = data.get('render_profile', '').strip()
+        
+        if profile not in RENDER_PROFILES:
+            return jsonify({'success': False, 'message': f'Invalid render profile: {profile}'}), 400
+        
+        config = load_config()
+        config['render_profile'] = profile
+        
+        if save_config(config):
+            return jsonify({'success': True, 'message': f'Render profile set to {profile}'})
+        
+        return jsonify({'success': False, 'message': 'Failed to save configuration'}), 500
+        
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
 @app.route('/api/admin/reauthorize', methods=['POST'])
 def reauthorize():
     """Reauthorize API access"""
@@ -782,6 +2532,7 @@ def reauthorize():
                     os.remove(temp_token_file)
                 
                 eero_api.reload_token()
+                event_broker.publish('admin', {'action': 'reauthorize'})
                 return jsonify({'success': True, 'message': 'API authentication successful!'})
             
             return jsonify({'success': False, 'message': 'Verification failed'}), 400
@@ -807,6 +2558,13 @@ if __name__ == '__main__':
     except Exception as e:
         logging.error(f"Initial cache update failed: {e}")
     
+    threading.Thread(target=config_service.watch, daemon=True).start()
+    threading.Thread(target=refresh_loop, daemon=True).start()
+    logging.info(f"Background refresh every {refresh_interval()}s")
+    threading.Thread(target=speedtest_schedule_loop, daemon=True).start()
+    threading.Thread(target=latency_prober.run, daemon=True).start()
+    logging.info(f"Latency probes every {PROBE_INTERVAL}s")
+    
     logging.info("Starting Flask server on 0.0.0.0:5000")
     logging.info("=" * 60)
     
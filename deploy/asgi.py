@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+MiniRack Dashboard - ASGI entry point
+Serves app.py from an asyncio event loop instead of a thread per connection:
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000 --ws wsproto
+
+or simply `python3 asgi.py`. SSE streams, the device WebSocket and speedtest
+start are handled natively on the loop; every other route runs the Flask view
+on a bounded thread pool, and refreshes run on their own executor (speedtests
+run on the speedtest engine's worker).
+"""
+import asyncio
+import io
+import logging
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+import app as dashboard
+
+REQUEST_THREADS = 16  # Flask views running at once; idle streams don't hold one
+BLOCKING_THREADS = 2  # Background refreshes
+
+request_executor = ThreadPoolExecutor(max_workers=REQUEST_THREADS, thread_name_prefix='request')
+blocking_executor = ThreadPoolExecutor(max_workers=BLOCKING_THREADS, thread_name_prefix='blocking')
+
+class AsyncStreamClient:
+    """StreamClient counterpart that is fed from any thread and awaited on the loop"""
+    def __init__(self, loop, maxlen=dashboard.STREAM_QUEUE_SIZE):
+        self.loop = loop
+        self.events = deque(maxlen=maxlen)
+        self.ready = asyncio.Event()
+        self.dropped = 0
+
+    def put(self, event):
+        """Queue an event, called by the broker from whichever thread published it"""
+        if not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._append, event)
+
+    def _append(self, event):
+        if len(self.events) == self.events.maxlen:
+            self.dropped += 1
+        self.events.append(event)
+        self.ready.set()
+
+    async def get(self, timeout):
+        """Wait for the next event, returning None on timeout or disconnect"""
+        if not self.events:
+            self.ready.clear()
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self.events.popleft() if self.events else None
+
+    def reset(self):
+        """Discard queued events after the client has been resynced"""
+        self.events.clear()
+        self.dropped = 0
+
+async def wait_disconnect(receive, client):
+    """Consume incoming messages until the peer goes away, then wake the client"""
+    while (await receive())['type'] not in ('http.disconnect', 'websocket.disconnect'):
+        pass
+    client.ready.set()
+
+def query_int(params, name):
+    """Integer query parameter, None if missing or invalid (like Flask's type=int)"""
+    try:
+        return int(params[name][0])
+    except (KeyError, ValueError):
+        return None
+
+async def send_json(send, status, body):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'access-control-allow-origin', b'*')
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': dashboard.json.dumps(body).encode()})
+
+async def stream(scope, receive, send):
+    """Native /api/stream - same events as the Flask view, no thread per client"""
+    client = dashboard.event_broker.subscribe(AsyncStreamClient(asyncio.get_running_loop()))
+    watcher = asyncio.ensure_future(wait_disconnect(receive, client))
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+                (b'access-control-allow-origin', b'*')
+            ]
+        })
+        initial = ('retry: 5000\n\n'
+                   + dashboard.format_sse('snapshot', dashboard.build_snapshot_event())
+                   + dashboard.format_sse('speedtest', dashboard.build_speedtest_event()))
+        await send({'type': 'http.response.body', 'body': initial.encode(), 'more_body': True})
+        while not watcher.done():
+            event = await client.get(dashboard.STREAM_HEARTBEAT)
+            if watcher.done():
+                break
+            chunk = event if event is not None else ': heartbeat\n\n'
+            await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+    finally:
+        watcher.cancel()
+        dashboard.event_broker.unsubscribe(client)
+
+async def devices_socket(scope, receive, send):
+    """Native /api/devices/ws - full list once, then versioned deltas keyed by MAC"""
+    if (await receive())['type'] != 'websocket.connect':
+        return
+    params = parse_qs(scope['query_string'].decode())
+    client, backlog = dashboard.device_tracker.subscribe(
+        query_int(params, 'since'),
+        query_int(params, 'epoch'),
+        AsyncStreamClient(asyncio.get_running_loop())
+    )
+    await send({'type': 'websocket.accept'})
+    watcher = asyncio.ensure_future(wait_disconnect(receive, client))
+    try:
+        for message in backlog:
+            await send({'type': 'websocket.send', 'text': message})
+        while not watcher.done():
+            message = await client.get(dashboard.STREAM_HEARTBEAT)
+            if client.dropped:
+                # Client fell behind and lost deltas - resync with the full list
+                client.reset()
+                await send({'type': 'websocket.send', 'text': dashboard.device_tracker.full_message()})
+            elif message is not None and not watcher.done():
+                await send({'type': 'websocket.send', 'text': message})
+    finally:
+        watcher.cancel()
+        dashboard.device_tracker.unsubscribe(client)
+
+async def start_speedtest(scope, receive, send):
+    """Native /api/speedtest/start - queues a job, the engine's worker runs it"""
+    job = dashboard.speedtest_engine.submit()
+    if job is None:
+        await send_json(send, 409, {'status': 'busy', 'message': 'Speedtest queue is full'})
+        return
+    await send_json(send, 200, {'status': job.state, 'job': job.to_dict()})
+
+NATIVE_ROUTES = {
+    ('GET', '/api/stream'): stream,
+    ('POST', '/api/speedtest/start'): start_speedtest
+}
+
+def build_environ(scope, body):
+    """WSGI environ for an ASGI HTTP scope"""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode().decode('latin1'),
+        'PATH_INFO': scope['path'].encode().decode('latin1'),
+        'QUERY_STRING': scope['query_string'].decode('latin1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+        'REMOTE_ADDR': scope['client'][0] if scope.get('client') else '',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin1').upper().replace('-', '_')
+        key = name if name in ('CONTENT_TYPE', 'CONTENT_LENGTH') else f"HTTP_{name}"
+        value = value.decode('latin1')
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+def run_wsgi(environ):
+    """Run a Flask view to completion on a worker thread"""
+    response = []
+
+    def start_response(status, headers, exc_info=None):
+        response[:] = [int(status.split(' ', 1)[0]), headers]
+
+    result = dashboard.app(environ, start_response)
+    try:
+        body = b''.join(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return response[0], response[1], body
+
+async def call_flask(scope, receive, send):
+    """Serve any other route through the Flask app on the request executor"""
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+        chunks.append(message.get('body', b''))
+        more_body = message.get('more_body', False)
+
+    environ = build_environ(scope, b''.join(chunks))
+    status, headers, body = await asyncio.get_running_loop().run_in_executor(request_executor, run_wsgi, environ)
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.lower().encode('latin1'), value.encode('latin1')) for name, value in headers]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+async def refresh_loop():
+    """Background cache refresh, run off the loop"""
+    loop = asyncio.get_running_loop()
+    delay = 0
+    while True:
+        await asyncio.sleep(delay)
+        delay = dashboard.refresh_interval()
+        if not dashboard.eero_api.network_id:
+            logging.warning("No network ID configured - please configure through web interface")
+            continue
+        try:
+            await loop.run_in_executor(blocking_executor, dashboard.update_cache)
+        except Exception as e:
+            logging.error(f"Background refresh error: {e}")
+
+async def lifespan(receive, send):
+    refresh = None
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            refresh = asyncio.ensure_future(refresh_loop())
+            threading.Thread(target=dashboard.config_service.watch, daemon=True).start()
+            threading.Thread(target=dashboard.speedtest_schedule_loop, daemon=True).start()
+            threading.Thread(target=dashboard.latency_prober.run, daemon=True).start()
+            logging.info(f"ASGI server ready, background refresh every {dashboard.refresh_interval()}s")
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if refresh:
+                refresh.cancel()
+            request_executor.shutdown(wait=False)
+            blocking_executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def application(scope, receive, send):
+    """ASGI application"""
+    if scope['type'] == 'http':
+        handler = NATIVE_ROUTES.get((scope['method'], scope['path']), call_flask)
+        await handler(scope, receive, send)
+    elif scope['type'] == 'websocket':
+        if scope['path'] == '/api/devices/ws':
+            await devices_socket(scope, receive, send)
+        else:
+            await send({'type': 'websocket.close', 'code': 1000})
+    elif scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    logging.info("=" * 60)
+    logging.info(f"Starting Eero Dashboard Backend {dashboard.CURRENT_VERSION} (ASGI)")
+    logging.info(f"Install Directory: {dashboard.INSTALL_DIR}")
+    logging.info("Starting uvicorn on 0.0.0.0:5000")
+    logging.info("=" * 60)
+
+    uvicorn.run(application, host='0.0.0.0', port=5000, ws='wsproto', ws_ping_interval=25, log_level='warning')
@@ -43,7 +43,8 @@ apt-get install -y \
     git \
     curl \
     htop \
-    ufw
+    ufw \
+    libcairo2
 
 # Install Python packages globally
 echo "🐍 Installing Python packages..."
@@ -51,9 +52,13 @@ pip3 install --upgrade pip
 pip3 install \
     flask \
     flask-cors \
+    flask-sock \
     requests \
     speedtest-cli \
-    gunicorn
+    gunicorn \
+    uvicorn \
+    wsproto \
+    cairosvg
 
 # Create directories
 echo "📁 Creating directories..."
@@ -71,7 +76,7 @@ cd /opt/eero/repo
 
 # Copy application files
 echo "📋 Installing application files..."
-cp deploy/app.py /opt/eero/app/
+cp deploy/app.py deploy/asgi.py deploy/speedtest_worker.py frontend/index.html /opt/eero/app/
 cp deploy/config.json /opt/eero/app/ 2>/dev/null || echo "No config file found, will create default"
 
 # Create default config if it doesn't exist
@@ -109,7 +114,7 @@ Group=www-data
 WorkingDirectory=/opt/eero/app
 Environment="PATH=/usr/local/bin:/usr/bin:/bin"
 Environment="PYTHONPATH=/opt/eero/app"
-ExecStart=/usr/bin/python3 /opt/eero/app/app.py
+ExecStart=/usr/bin/python3 /opt/eero/app/asgi.py
 ExecReload=/bin/kill -HUP $MAINPID
 Restart=always
 RestartSec=10
@@ -164,6 +169,16 @@ server {
         proxy_buffers 8 4k;
     }
     
+    # Device delta WebSocket - needs HTTP/1.1 and the upgrade headers passed through
+    location /api/devices/ws {
+        proxy_pass http://127.0.0.1:5000;
+        proxy_http_version 1.1;
+        proxy_set_header Upgrade $http_upgrade;
+        proxy_set_header Connection "upgrade";
+        proxy_set_header Host $host;
+        proxy_read_timeout 1h;
+    }
+    
     # Health check endpoint
     location /health {
         proxy_pass http://127.0.0.1:5000/health;
@@ -216,7 +231,7 @@ git reset --hard origin/main
 git pull origin main
 
 # Copy new files
-cp deploy/app.py /opt/eero/app/
+cp deploy/app.py deploy/asgi.py deploy/speedtest_worker.py frontend/index.html /opt/eero/app/
 # Don't overwrite existing config
 if [ ! -f "/opt/eero/app/config.json" ]; then
     cp deploy/config.json /opt/eero/app/
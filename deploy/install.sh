@@ -12,10 +12,10 @@ echo "🚀 Starting MiniRack Dashboard deployment..."
 
 # Update system
 apt-get update -y
-apt-get install -y python3-pip nginx git curl
+apt-get install -y python3-pip nginx git curl libcairo2
 
 # Install Python packages
-pip3 install flask flask-cors requests speedtest-cli gunicorn
+pip3 install flask flask-cors flask-sock requests speedtest-cli gunicorn uvicorn wsproto cairosvg
 
 # Create directories
 mkdir -p $INSTALL_DIR/{app,logs}
@@ -32,7 +32,7 @@ fi
 
 # Copy application files
 echo "📋 Copying application files..."
-cp $INSTALL_DIR/repo/deploy/app.py $INSTALL_DIR/app/
+cp $INSTALL_DIR/repo/deploy/app.py $INSTALL_DIR/repo/deploy/asgi.py $INSTALL_DIR/repo/deploy/speedtest_worker.py $INSTALL_DIR/repo/frontend/index.html $INSTALL_DIR/app/
 cp $INSTALL_DIR/repo/deploy/config.json $INSTALL_DIR/app/ 2>/dev/null || echo "No config file found, using defaults"
 
 # Set permissions
@@ -50,7 +50,7 @@ After=network.target
 Type=simple
 User=www-data
 WorkingDirectory=$INSTALL_DIR/app
-ExecStart=/usr/bin/python3 $INSTALL_DIR/app/app.py
+ExecStart=/usr/bin/python3 $INSTALL_DIR/app/asgi.py
 Restart=always
 RestartSec=10
 Environment=PYTHONPATH=$INSTALL_DIR/app
@@ -76,6 +76,16 @@ server {
         proxy_send_timeout 60s;
         proxy_read_timeout 60s;
     }
+    
+    # Device delta WebSocket - needs HTTP/1.1 and the upgrade headers passed through
+    location /api/devices/ws {
+        proxy_pass http://127.0.0.1:5000;
+        proxy_http_version 1.1;
+        proxy_set_header Upgrade \$http_upgrade;
+        proxy_set_header Connection "upgrade";
+        proxy_set_header Host \$host;
+        proxy_read_timeout 1h;
+    }
 }
 EOF
 
@@ -97,7 +107,7 @@ cat > $INSTALL_DIR/update.sh << 'EOF'
 #!/bin/bash
 cd /opt/eero/repo
 git pull origin main
-cp deploy/app.py /opt/eero/app/
+cp deploy/app.py deploy/asgi.py deploy/speedtest_worker.py frontend/index.html /opt/eero/app/
 systemctl restart eero
 echo "✅ Dashboard updated successfully!"
 EOF
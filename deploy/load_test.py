@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+MiniRack Dashboard - API load test
+Keeps a few clients hitting the read endpoints and reports latency
+percentiles, optionally while a speedtest is running:
+
+    python3 load_test.py [base_url] [seconds] [clients] [--speedtest]
+
+With --speedtest the run is split in two: a baseline of the given length,
+then the same load for as long as a speedtest started through the API takes,
+so the two latency distributions can be compared.
+"""
+import http.client
+import json
+import statistics
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+PATHS = [
+    '/api/dashboard/summary',
+    '/api/dashboard',
+    '/api/devices?limit=50',
+    '/api/version'
+]
+
+class Client(threading.Thread):
+    """One keep-alive connection cycling through PATHS until stopped"""
+    def __init__(self, base_url, stop):
+        super().__init__(daemon=True)
+        url = urlsplit(base_url)
+        self.host, self.port = url.hostname, url.port or 80
+        self.stop = stop
+        self.latencies = []
+        self.errors = 0
+
+    def run(self):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        i = 0
+        while not self.stop.is_set():
+            path = PATHS[i % len(PATHS)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                conn.request('GET', path)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 500:
+                    self.errors += 1
+                else:
+                    self.latencies.append((time.perf_counter() - started) * 1000)
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+def run_load(base_url, clients, until):
+    """Run the clients until until() returns True, returning (latencies, errors, seconds)"""
+    stop = threading.Event()
+    workers = [Client(base_url, stop) for _ in range(clients)]
+    started = time.time()
+    for worker in workers:
+        worker.start()
+    while not until():
+        time.sleep(0.2)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    latencies = sorted(ms for worker in workers for ms in worker.latencies)
+    return latencies, sum(worker.errors for worker in workers), time.time() - started
+
+def report(label, latencies, errors, seconds):
+    if not latencies:
+        print(f"{label:<12} no successful requests ({errors} errors)")
+        return
+    print(f"{label:<12}{len(latencies) / seconds:>8.1f} req/s"
+          f"{statistics.median(latencies):>9.1f}{percentile(latencies, 95):>9.1f}"
+          f"{percentile(latencies, 99):>9.1f}{latencies[-1]:>9.1f}{errors:>8}")
+
+def api(base_url, method, path):
+    url = urlsplit(base_url)
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+    conn.request(method, path)
+    return json.loads(conn.getresponse().read())
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    base_url = args[0] if args else 'http://localhost:5000'
+    seconds = float(args[1]) if len(args) > 1 else 20
+    clients = int(args[2]) if len(args) > 2 else 4
+
+    print(f"{clients} clients against {base_url} (latency in ms)")
+    print(f"{'phase':<12}{'throughput':>12}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}{'errors':>8}")
+    deadline = time.time() + seconds
+    report('baseline', *run_load(base_url, clients, lambda: time.time() > deadline))
+
+    if '--speedtest' in sys.argv:
+        job = api(base_url, 'POST', '/api/speedtest/start').get('job')
+        if job is None:
+            print("Could not start a speedtest")
+            return
+        finished = lambda: api(base_url, 'GET', f"/api/speedtest/jobs/{job['id']}")['state'] not in ('queued', 'running')
+        report('speedtest', *run_load(base_url, clients, finished))
+        result = api(base_url, 'GET', f"/api/speedtest/jobs/{job['id']}")
+        print(f"speedtest {result['state']}: {result['result'] or result['error']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+MiniRack Dashboard - speedtest worker process
+Started by the speedtest engine in app.py so speedtest-cli's download/upload
+threads can't starve the web process of CPU or the GIL:
+
+    python3 speedtest_worker.py '{"nice": 10, "cpus": [3], "memory_mb": 512, "server_cache": ...}'
+
+Applies the given niceness, CPU affinity and memory/CPU-time limits to itself,
+reuses the cached server choice while it is fresh, then reports progress as
+one JSON object per line on stdout:
+
+    {"event": "phase", "phase": "download"}
+    {"event": "sample", "phase": "download", "elapsed": 1.5, "mbps": 84.2}
+    {"event": "result", "result": {...}}
+    {"event": "error", "error": "..."}
+"""
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from datetime import datetime
+
+import speedtest
+
+UNREACHABLE_MS = 60000  # speedtest-cli scores servers it couldn't reach as ~1.8M ms
+THREAD_STACK_SIZE = 1024 * 1024  # speedtest-cli starts a dozen threads; 8 MiB default stacks add up under the cap
+
+output_lock = threading.Lock()
+
+def emit(event, **fields):
+    """Write one event line to the pipe"""
+    with output_lock:
+        sys.stdout.write(json.dumps({'event': event, **fields}) + '\n')
+        sys.stdout.flush()
+
+def apply_limits(limits):
+    """Lower this process's priority and cap what it can use"""
+    os.nice(limits.get('nice', 0))
+    if limits.get('cpus') and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, limits['cpus'])
+    if limits.get('memory_mb'):
+        # RLIMIT_DATA counts memory actually mapped writable; RLIMIT_AS would also count
+        # the address space glibc reserves per thread arena and stop threads starting
+        threading.stack_size(THREAD_STACK_SIZE)
+        cap = limits['memory_mb'] * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_DATA, (cap, cap))
+    if limits.get('cpu_seconds'):
+        resource.setrlimit(resource.RLIMIT_CPU, (limits['cpu_seconds'], limits['cpu_seconds'] + 5))
+
+class ThroughputMeter:
+    """Count the bytes a Speedtest moves so throughput can be sampled mid-phase
+
+    Wraps the speedtest-cli opener: downloads are counted as responses are
+    read, uploads through the byte totals their request bodies keep.
+    """
+    def __init__(self, st):
+        self.lock = threading.Lock()
+        self.received = 0
+        self.uploads = []
+        self.open = st._opener.open
+        st._opener.open = self.counting_open
+
+    def counting_open(self, req, *args, **kwargs):
+        if hasattr(getattr(req, 'data', None), 'total'):
+            self.uploads.append(req.data)
+        response = self.open(req, *args, **kwargs)
+        read = response.read
+
+        def counting_read(*read_args, **read_kwargs):
+            chunk = read(*read_args, **read_kwargs)
+            with self.lock:
+                self.received += len(chunk)
+            return chunk
+
+        response.read = counting_read
+        return response
+
+    def total(self):
+        with self.lock:
+            received = self.received
+        return received + sum(sum(data.total) for data in list(self.uploads))
+
+def sample(meter, state, interval, done):
+    """Emit throughput for the download and upload phases until done is set"""
+    phase, baseline, phase_started = None, 0, 0
+    while not done.wait(interval):
+        if state['phase'] not in ('download', 'upload'):
+            continue
+        now, total = time.time(), meter.total()
+        if state['phase'] != phase:
+            phase, baseline, phase_started = state['phase'], total, now
+            continue
+        mbps = round((total - baseline) * 8 / (now - phase_started) / 1_000_000, 2)
+        emit('sample', phase=phase, elapsed=round(now - phase_started, 1), mbps=mbps)
+
+def load_server_cache(options):
+    """Cached best server and fallback pool, None if missing or older than the TTL"""
+    try:
+        with open(options['server_cache']) as f:
+            cache = json.load(f)
+        if time.time() - cache['fetched'] < options.get('server_ttl', 0) and cache['best']:
+            return cache
+    except (KeyError, OSError, ValueError):
+        pass
+    return None
+
+def save_server_cache(options, cache):
+    path = options.get('server_cache')
+    if not path:
+        return
+    try:
+        with open(path + '.tmp', 'w') as f:
+            json.dump(cache, f)
+        os.replace(path + '.tmp', path)
+    except OSError:
+        pass
+
+def pick_server(st, options, enter):
+    """Choose the test server and measure ping against it
+
+    The server list download and candidate pings only happen when the cache
+    has expired; otherwise the cached best server is pinged, then the rest of
+    the cached pool if it has become unreachable.
+    """
+    cache = load_server_cache(options)
+    if cache:
+        enter('ping')
+        pool = [server for server in cache['pool'] if server['id'] != cache['best']['id']]
+        for candidates in ([cache['best']], pool):
+            if candidates and st.get_best_server(candidates)['latency'] < UNREACHABLE_MS:
+                cache['best'] = st.best
+                save_server_cache(options, cache)
+                return True
+
+    st.get_servers()
+    st.get_closest_servers()
+    enter('ping')
+    st.get_best_server()
+    save_server_cache(options, {'fetched': time.time(), 'best': st.best, 'pool': st.closest})
+    return False
+
+def run(options):
+    state = {'phase': 'server'}
+    emit('phase', phase='server')
+    st = speedtest.Speedtest()
+    meter = ThroughputMeter(st)
+    done = threading.Event()
+    sampler = threading.Thread(target=sample, args=(meter, state, options.get('sample_interval', 0.5), done), daemon=True)
+    sampler.start()
+
+    def enter(phase):
+        state['phase'] = phase
+        emit('phase', phase=phase)
+
+    try:
+        cached = pick_server(st, options, enter)
+        enter('download')
+        download = st.download()
+        enter('upload')
+        # Generating upload data on the fly keeps memory within the cap
+        upload = st.upload(pre_allocate=not options.get('memory_mb'))
+    finally:
+        done.set()
+        sampler.join()
+
+    emit('result', result={
+        'download': round(download / 1_000_000, 2),
+        'upload': round(upload / 1_000_000, 2),
+        'ping': round(st.results.ping, 2),
+        'server': st.results.server.get('sponsor'),
+        'server_cached': cached,
+        'timestamp': datetime.now().isoformat()
+    })
+
+def main():
+    options = json.loads(sys.argv[1]) if len(sys.argv) > 1 else {}
+    try:
+        apply_limits(options)
+        run(options)
+    except MemoryError:
+        emit('error', error='Speedtest exceeded its memory limit')
+        sys.exit(1)
+    except Exception as e:
+        emit('error', error=str(e))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
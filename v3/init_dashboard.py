@@ -17,6 +17,9 @@ INSTALL_DIR = "/home/eero/dashboard"
 CONFIG_FILE = f"{INSTALL_DIR}/.config.json"
 TOKEN_FILE = f"{INSTALL_DIR}/.eero_token"
 USER = "eero"
+# Backend listens on a Unix socket behind nginx unless installed with --tcp
+BACKEND_SOCKET = "/run/eero-dashboard/gunicorn.sock"
+BACKEND_ADDR = "127.0.0.1:5000" if '--tcp' in sys.argv else f"unix:{BACKEND_SOCKET}"
 
 class C:
     R = '\033[0;31m'
@@ -176,7 +179,7 @@ def create_dirs():
 
 def setup_python():
     run_cmd(f'sudo -u {USER} python3 -m venv {INSTALL_DIR}/venv', 120)
-    run_cmd(f'sudo -u {USER} {INSTALL_DIR}/venv/bin/pip install --quiet flask flask-cors requests gunicorn speedtest-cli', 300)
+    run_cmd(f'sudo -u {USER} {INSTALL_DIR}/venv/bin/pip install --quiet flask flask-cors requests gunicorn speedtest-cli brotli', 300)
     ps("Python ready")
 
 def create_backend(nid):
@@ -192,11 +195,19 @@ import subprocess
 import urllib.request
 import re
 import time
+import mmap
+import struct
+import gzip
 from datetime import datetime, timedelta
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 import logging
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 app = Flask(__name__)
 CORS(app)
 logging.basicConfig(
@@ -212,6 +223,17 @@ CONFIG_FILE = "/home/eero/dashboard/.config.json"
 GITHUB_RAW = "https://raw.githubusercontent.com/{GITHUB_REPO}/main"
 SCRIPT_URL_V3 = f"{{GITHUB_RAW}}/v3/init_dashboard.py"
 
+# Shared mode: one collector process polls Eero and publishes snapshots,
+# gunicorn workers only read them
+SHARED_MODE = os.environ.get('DASHBOARD_MODE') == 'shared'
+SNAPSHOT_FILE = os.environ.get('DASHBOARD_SNAPSHOT', '/dev/shm/eero-dashboard.snapshot')
+SNAPSHOT_SIZE = 4 * 1024 * 1024
+SNAPSHOT_HEADER = struct.Struct('<QI')
+SPEEDTEST_TRIGGER = "/home/eero/dashboard/.speedtest_request"
+COLLECT_INTERVAL = 60
+# The collector also writes read-only responses here for nginx to serve directly
+STATIC_DIR = os.environ.get('DASHBOARD_STATIC_DIR', '/dev/shm/eero-dashboard')
+
 def load_config():
     try:
         if os.path.exists(CONFIG_FILE):
@@ -437,6 +459,88 @@ data_cache = {{
     'speedtest_result': None
 }}
 
+class SnapshotStore:
+    """data_cache shared through an mmap'd file with a version counter.
+
+    Single writer: the version goes odd while the payload is copied and even
+    once it is complete. Readers retry on an odd or moved version and keep the
+    last parsed snapshot, so JSON is decoded once per change per worker.
+    """
+    def __init__(self, path, writer=False):
+        self.path = path
+        self.writer = writer
+        self.mm = None
+        self.version = 0
+        self.cached = None
+    
+    def open(self):
+        if self.mm is not None:
+            return True
+        try:
+            if self.writer:
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                os.ftruncate(fd, SNAPSHOT_SIZE)
+                self.mm = mmap.mmap(fd, SNAPSHOT_SIZE)
+                # Carry on from the previous collector's version so readers see a change
+                v = SNAPSHOT_HEADER.unpack_from(self.mm, 0)[0]
+                self.version = v + (v % 2)
+            else:
+                fd = os.open(self.path, os.O_RDONLY)
+                self.mm = mmap.mmap(fd, SNAPSHOT_SIZE, access=mmap.ACCESS_READ)
+            os.close(fd)
+            return True
+        except FileNotFoundError as e:
+            if self.writer:
+                logging.warning(f"Snapshot store {{self.path}} unavailable: {{e}}")
+            else:
+                # Expected until the collector has started; readers retry on every request
+                logging.debug(f"Snapshot store {{self.path}} not created yet")
+            return False
+        except (OSError, ValueError) as e:
+            logging.warning(f"Snapshot store {{self.path}} unavailable: {{e}}")
+            return False
+    
+    def publish(self, data):
+        if not self.open():
+            return False
+        final = self.version + 2
+        payload = json.dumps(dict(data, version=final)).encode()
+        if SNAPSHOT_HEADER.size + len(payload) > SNAPSHOT_SIZE:
+            logging.error(f"Snapshot too large: {{len(payload)}} bytes")
+            return False
+        SNAPSHOT_HEADER.pack_into(self.mm, 0, self.version + 1, 0)
+        self.mm[SNAPSHOT_HEADER.size:SNAPSHOT_HEADER.size + len(payload)] = payload
+        SNAPSHOT_HEADER.pack_into(self.mm, 0, final, len(payload))
+        self.version = final
+        return True
+    
+    def read(self):
+        if not self.open():
+            return None
+        for _ in range(50):
+            version, length = SNAPSHOT_HEADER.unpack_from(self.mm, 0)
+            if self.cached and version == self.cached['version']:
+                return self.cached
+            if version % 2 == 0 and length:
+                payload = self.mm[SNAPSHOT_HEADER.size:SNAPSHOT_HEADER.size + length]
+                if SNAPSHOT_HEADER.unpack_from(self.mm, 0)[0] == version:
+                    try:
+                        data = json.loads(payload)
+                    except ValueError:
+                        data = None
+                    if data and data.get('version') == version:
+                        self.cached = data
+                        return data
+            time.sleep(0.001)
+        return self.cached
+
+snapshot_store = SnapshotStore(SNAPSHOT_FILE)
+
+def current_cache():
+    if SHARED_MODE:
+        return snapshot_store.read() or data_cache
+    return data_cache
+
 def update_cache():
     global data_cache
     try:
@@ -572,26 +676,80 @@ def run_speedtest():
     finally:
         data_cache['speedtest_running'] = False
 
+def write_static(name, data):
+    # Compressed variants first, so nginx never finds a .gz older than the plain file
+    body = json.dumps(data).encode()
+    variants = [('.gz', gzip.compress(body, 9))]
+    if brotli:
+        variants.append(('.br', brotli.compress(body)))
+    variants.append(('', body))
+    for ext, content in variants:
+        path = os.path.join(STATIC_DIR, name + ext)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(content)
+        os.replace(path + '.tmp', path)
+
+def publish_static(c):
+    try:
+        os.makedirs(STATIC_DIR, exist_ok=True)
+        write_static('dashboard.json', c)
+        write_static('devices.json', {{'devices': c.get('devices', []), 'count': len(c.get('devices', []))}})
+    except OSError as e:
+        logging.error(f"Static publish to {{STATIC_DIR}} failed: {{e}}")
+
+def run_collector():
+    store = SnapshotStore(SNAPSHOT_FILE, writer=True)
+    logging.info(f"Collector publishing to {{SNAPSHOT_FILE}} and {{STATIC_DIR}} every {{COLLECT_INTERVAL}}s")
+    
+    def publish():
+        store.publish(data_cache)
+        publish_static(data_cache)
+    
+    next_poll = 0
+    while True:
+        if time.time() >= next_poll:
+            update_cache()
+            publish()
+            next_poll = time.time() + COLLECT_INTERVAL
+        if os.path.exists(SPEEDTEST_TRIGGER):
+            os.remove(SPEEDTEST_TRIGGER)
+            data_cache['speedtest_running'] = True
+            publish()
+            run_speedtest()
+            publish()
+        time.sleep(1)
+
 @app.route('/api/dashboard')
 def get_dashboard():
+    if SHARED_MODE:
+        return jsonify(current_cache())
     logging.info("Dashboard endpoint called - updating cache...")
     update_cache()
     return jsonify(data_cache)
 
 @app.route('/api/devices')
 def get_devices():
-    return jsonify({{'devices': data_cache.get('devices', []), 'count': len(data_cache.get('devices', []))}})
+    c = current_cache()
+    return jsonify({{'devices': c.get('devices', []), 'count': len(c.get('devices', []))}})
 
 @app.route('/api/speedtest/start', methods=['POST'])
 def start_speedtest():
-    if data_cache['speedtest_running']:
+    if current_cache()['speedtest_running']:
         return jsonify({{'status': 'running'}}), 409
+    if SHARED_MODE:
+        # The collector owns all state, hand the request over to it
+        try:
+            os.close(os.open(SPEEDTEST_TRIGGER, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return jsonify({{'status': 'running'}}), 409
+        return jsonify({{'status': 'started'}})
     threading.Thread(target=run_speedtest, daemon=True).start()
     return jsonify({{'status': 'started'}})
 
 @app.route('/api/speedtest/status')
 def speedtest_status():
-    return jsonify({{'running': data_cache['speedtest_running'], 'result': data_cache['speedtest_result']}})
+    c = current_cache()
+    return jsonify({{'running': c['speedtest_running'] or os.path.exists(SPEEDTEST_TRIGGER), 'result': c['speedtest_result']}})
 
 @app.route('/api/health')
 def health():
@@ -655,6 +813,8 @@ if __name__ == '__main__':
     logging.info(f"Token file exists: {{os.path.exists(API_TOKEN_FILE)}}")
     logging.info(f"Config file path: {{CONFIG_FILE}}")
     logging.info(f"Config file exists: {{os.path.exists(CONFIG_FILE)}}")
+    if '--collector' in sys.argv:
+        run_collector()
     update_cache()
     logging.info("Starting Flask app...")
     app.run(host='127.0.0.1', port=5000, debug=False)
@@ -1366,37 +1526,89 @@ def create_frontend():
 
 def configure_nginx():
     pi("Configuring NGINX...")
-    cfg = """server {
+    # Snapshots written by the collector are served straight from tmpfs,
+    # falling back to the backend until the first one exists
+    mods = '/etc/nginx/modules-enabled'
+    brotli = "brotli_static on; " if os.path.isdir(mods) and any('brotli' in m for m in os.listdir(mods)) else ""
+    static = f"root /dev/shm/eero-dashboard; default_type application/json; gzip_static on; {brotli}add_header Cache-Control no-cache;"
+    proxy = 'proxy_pass http://eero_backend; proxy_http_version 1.1; proxy_set_header Connection ""; proxy_read_timeout 120s;'
+    # Read-only GETs are cached for a couple of seconds and concurrent misses wait
+    # on a single upstream request, so a burst from many screens hits Python once
+    cache = "proxy_cache eero_api; proxy_cache_valid 200 2s; proxy_cache_lock on; proxy_cache_lock_timeout 10s; proxy_cache_use_stale updating; add_header X-Cache-Status $upstream_cache_status;"
+    # nginx only creates the last component of the cache path, and Debian's
+    # package doesn't ship /var/cache/nginx
+    cache_dir = '/var/cache/nginx/eero-dashboard'
+    os.makedirs(cache_dir, exist_ok=True)
+    shutil.chown(cache_dir, 'www-data', 'www-data')
+    cfg = f"""proxy_cache_path {cache_dir} levels=1:2 keys_zone=eero_api:1m max_size=16m inactive=1m use_temp_path=off;
+
+upstream eero_backend {{
+    server {BACKEND_ADDR};
+    keepalive 16;
+}}
+
+server {{
     listen 80 default_server;
     root /home/eero/dashboard/frontend;
     index index.html;
-    location / { try_files $uri $uri/ =404; }
-    location /assets/ { alias /home/eero/dashboard/frontend/assets/; }
-    location /api/ { proxy_pass http://127.0.0.1:5000; proxy_read_timeout 120s; }
-}"""
+    location / {{ try_files $uri $uri/ =404; }}
+    location /assets/ {{ alias /home/eero/dashboard/frontend/assets/; }}
+    location = /api/dashboard {{ {static} try_files /dashboard.json @backend; }}
+    location = /api/devices {{ {static} try_files /devices.json @backend; }}
+    location /api/ {{ {proxy} {cache} }}
+    location /api/admin/ {{ {proxy} }}
+    location /api/speedtest/ {{ {proxy} }}
+    location @backend {{ {proxy} {cache} }}
+}}"""
     with open('/etc/nginx/sites-available/eero-dashboard', 'w') as f:
         f.write(cfg)
     for f in ['/etc/nginx/sites-enabled/default', '/etc/nginx/sites-enabled/eero-dashboard']:
         if os.path.exists(f):
             os.remove(f)
     os.symlink('/etc/nginx/sites-available/eero-dashboard', '/etc/nginx/sites-enabled/eero-dashboard')
-    run_cmd('nginx -t')
+    check = subprocess.run(['nginx', '-t'], capture_output=True, text=True)
+    if check.returncode != 0:
+        # Leave the running nginx alone rather than restart it into a broken config
+        raise RuntimeError(f"nginx config test failed:\n{check.stderr.strip()}")
     run_cmd('systemctl restart nginx')
     run_cmd('systemctl enable nginx')
     ps("NGINX ready")
 
 def create_service():
     pi("Creating service...")
+    # Workers only serve snapshots published by the collector, so scale them with the cores
+    workers = max(2, os.cpu_count() or 2)
     svc = f"""[Unit]
 Description=Eero Dashboard v3
 After=network.target
+Wants=eero-dashboard-collector.service
+
+[Service]
+Type=simple
+User={USER}
+WorkingDirectory={INSTALL_DIR}/backend
+Environment="PATH={INSTALL_DIR}/venv/bin"
+Environment="DASHBOARD_MODE=shared"
+RuntimeDirectory=eero-dashboard
+ExecStart={INSTALL_DIR}/venv/bin/gunicorn -w {workers} -k gthread --threads 4 -b {BACKEND_ADDR} --keep-alive 75 --timeout 120 eero_api:app
+Restart=always
+RestartSec=10
+
+[Install]
+WantedBy=multi-user.target
+"""
+    collector = f"""[Unit]
+Description=Eero Dashboard v3 collector
+After=network.target
+PartOf=eero-dashboard.service
 
 [Service]
 Type=simple
 User={USER}
 WorkingDirectory={INSTALL_DIR}/backend
 Environment="PATH={INSTALL_DIR}/venv/bin"
-ExecStart={INSTALL_DIR}/venv/bin/gunicorn -w 2 -b 127.0.0.1:5000 --timeout 120 eero_api:app
+Environment="DASHBOARD_MODE=shared"
+ExecStart={INSTALL_DIR}/venv/bin/python eero_api.py --collector
 Restart=always
 RestartSec=10
 
@@ -1405,9 +1617,11 @@ WantedBy=multi-user.target
 """
     with open('/etc/systemd/system/eero-dashboard.service', 'w') as f:
         f.write(svc)
+    with open('/etc/systemd/system/eero-dashboard-collector.service', 'w') as f:
+        f.write(collector)
     run_cmd('systemctl daemon-reload')
-    run_cmd('systemctl enable eero-dashboard.service')
-    run_cmd('systemctl start eero-dashboard.service')
+    run_cmd('systemctl enable eero-dashboard-collector.service eero-dashboard.service')
+    run_cmd('systemctl start eero-dashboard-collector.service eero-dashboard.service')
     time.sleep(2)
     ps("Service started")
 
@@ -8,9 +8,16 @@ import shutil
 import threading
 import time
 import json
+import gzip
+import hashlib
 import requests
 from pathlib import Path
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 SCRIPT_VERSION = "5.2.4"
 GITHUB_REPO = "eero-drew/minirackdash"
 GITHUB_RAW = f"https://raw.githubusercontent.com/{GITHUB_REPO}/main"
@@ -18,8 +25,15 @@ SCRIPT_URL_V5 = f"{GITHUB_RAW}/v5/init_dashboard.py"
 INSTALL_DIR = "/home/eero/dashboard"
 CONFIG_FILE = f"{INSTALL_DIR}/.config.json"
 TOKEN_FILE = f"{INSTALL_DIR}/.eero_token"
+VENDOR_DIR = f"{INSTALL_DIR}/vendor"  # Last downloaded third-party assets, kept across reinstalls
 USER = "eero"
 
+# Third-party assets vendored into the frontend so the kiosk never needs a CDN
+CHARTJS_URL = "https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js"
+FONTAWESOME_URL = "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css"
+FONTAWESOME_FONTS = "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/webfonts"
+FINGERPRINTED = re.compile(r'^[\w-]+\.[0-9a-f]{10}\.\w+(\.gz|\.br)?$')
+
 class Colors:
     RED = '\033[0;31m'
     GREEN = '\033[0;32m'
@@ -473,7 +487,7 @@ def create_backend_api(network_id, api_url):
     print_info("Creating backend...")
     
     backend_code = r'''#!/usr/bin/env python3
-import os, sys, json, requests, speedtest, threading, subprocess, urllib.request, re, time, socket
+import os, sys, json, requests, speedtest, threading, subprocess, urllib.request, re, time, socket, mimetypes
 from datetime import datetime, timedelta
 from flask import Flask, jsonify, request, send_from_directory
 from flask_cors import CORS
@@ -788,13 +802,33 @@ def run_speedtest():
     finally:
         data_cache['speedtest_running'] = False
 
+FINGERPRINTED = re.compile(r'\.[0-9a-f]{10}\.\w+$')
+
+def send_static(directory, path):
+    # Prefer the precompressed variant written by the installer; fingerprinted files never change
+    for encoding, ext in (('br', '.br'), ('gzip', '.gz')):
+        if encoding in request.accept_encodings and os.path.isfile(os.path.join(directory, path + ext)):
+            mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+            resp = send_from_directory(directory, path + ext, mimetype=mimetype)
+            resp.headers['Content-Encoding'] = encoding
+            break
+    else:
+        resp = send_from_directory(directory, path)
+    resp.headers['Vary'] = 'Accept-Encoding'
+    resp.headers['Cache-Control'] = 'public, max-age=31536000, immutable' if FINGERPRINTED.search(path) else 'no-cache'
+    return resp
+
 @app.route('/')
 def index():
-    return send_from_directory(app.static_folder, 'index.html')
+    return send_static(app.static_folder, 'index.html')
+
+@app.route('/sw.js')
+def service_worker():
+    return send_static(app.static_folder, 'sw.js')
 
 @app.route('/assets/<path:path>')
 def send_assets(path):
-    return send_from_directory(os.path.join(app.static_folder, 'assets'), path)
+    return send_static(os.path.join(app.static_folder, 'assets'), path)
 
 @app.route('/api/dashboard')
 def get_dashboard_data():
@@ -829,7 +863,8 @@ def get_version():
         'name': 'Eero Dashboard',
         'network_id': config.get('network_id', eero_api.network_id),
         'environment': env,
-        'api_url': config.get('api_url', 'api-user.stage.e2ro.com')
+        'api_url': config.get('api_url', 'api-user.stage.e2ro.com'),
+        'render_profile': config.get('render_profile', 'standard')
     })
 
 @app.route('/api/admin/check-update')
@@ -899,6 +934,21 @@ def change_network_id():
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@app.route('/api/admin/render-profile', methods=['POST'])
+def change_render_profile():
+    try:
+        data = request.get_json()
+        profile = data.get('render_profile', '').strip()
+        if profile not in ('standard', 'low-power'):
+            return jsonify({'success': False, 'message': 'Invalid profile'}), 400
+        config = load_config()
+        config['render_profile'] = profile
+        if save_config(config):
+            return jsonify({'success': True, 'message': f'Render profile set to {profile}'})
+        return jsonify({'success': False, 'message': 'Save failed'}), 500
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
 @app.route('/api/admin/reauthorize', methods=['POST'])
 def reauthorize():
     try:
@@ -1041,6 +1091,7 @@ def create_frontend():
         .speedtest-unit { font-size: 14px; color: rgba(255,255,255,.7); margin-left: 5px; }
         .spinner { border: 4px solid rgba(255,255,255,.1); border-top: 4px solid #4da6ff; border-radius: 50%; width: 40px; height: 40px; animation: spin 1s linear infinite; margin: 20px auto; }
         @keyframes spin { 0% { transform: rotate(0deg); } 100% { transform: rotate(360deg); } }
+        body.low-power *, body.low-power *::before, body.low-power *::after { animation: none !important; transition: none !important; }
         
         .admin-menu { display: grid; gap: 15px; }
         .admin-btn { padding: 15px; background: rgba(77,166,255,.2); border: 2px solid #4da6ff; border-radius: 10px; color: #fff; font-size: 14px; cursor: pointer; transition: all .3s; display: flex; align-items: center; gap: 10px; }
@@ -1138,6 +1189,7 @@ def create_frontend():
                 <button class="admin-btn" onclick="showNetworkIdForm()"><i class="fas fa-network-wired"></i><span>Change Network ID</span></button>
                 <button class="admin-btn" onclick="showReauthorizeForm()"><i class="fas fa-key"></i><span>Reauthorize API</span></button>
                 <button class="admin-btn" onclick="restartService()"><i class="fas fa-rotate-right"></i><span>Restart Service</span></button>
+                <button class="admin-btn" onclick="showRenderProfileForm()"><i class="fas fa-leaf"></i><span>Render Profile</span></button>
                 <button class="admin-btn" onclick="rebootSystem()"><i class="fas fa-power-off"></i><span>Reboot System</span></button>
             </div>
             <div id="adminFormContainer"></div>
@@ -1146,16 +1198,20 @@ def create_frontend():
     </div>
     
     <script>
-        let charts={},speedtestInterval=null;
-        function initCharts(){const o={maintainAspectRatio:!1,responsive:!0,plugins:{legend:{labels:{color:"#fff"}}}};charts.users=new Chart(document.getElementById("usersChart").getContext("2d"),{type:"line",data:{labels:[],datasets:[{label:"Connected",data:[],borderColor:"#4da6ff",backgroundColor:"rgba(77,166,255,0.1)",tension:.4,fill:!0}]},options:{...o,scales:{y:{ticks:{color:"#fff"}},x:{ticks:{color:"#fff"}}}}});charts.deviceOS=new Chart(document.getElementById("deviceOSChart").getContext("2d"),{type:"doughnut",data:{labels:["iOS","Android","Windows","Other"],datasets:[{data:[0,0,0,0],backgroundColor:["#4da6ff","#51cf66","#74c0fc","#ffd43b"]}]},options:o});charts.frequency=new Chart(document.getElementById("frequencyChart").getContext("2d"),{type:"doughnut",data:{labels:["2.4 GHz","5 GHz","6 GHz"],datasets:[{data:[0,0,0],backgroundColor:["#ff922b","#4da6ff","#b197fc"]}]},options:o});charts.signalStrength=new Chart(document.getElementById("signalStrengthChart").getContext("2d"),{type:"line",data:{labels:[],datasets:[{label:"Avg Signal",data:[],borderColor:"#51cf66",backgroundColor:"rgba(81,207,102,0.1)",tension:.4,fill:!0}]},options:{...o,scales:{y:{ticks:{color:"#fff"}},x:{ticks:{color:"#fff"}}}}})}
-        async function updateDashboard(){try{const r=await fetch("/api/dashboard"),d=await r.json();charts.users.data.labels=d.connected_users.map(e=>new Date(e.timestamp).toLocaleTimeString());charts.users.data.datasets[0].data=d.connected_users.map(e=>e.count);charts.users.update();const os=d.device_os||{};charts.deviceOS.data.datasets[0].data=[os.iOS||0,os.Android||0,os.Windows||0,os.Other||0];charts.deviceOS.update();document.getElementById("deviceOsSubtitle").textContent=`${Object.values(os).reduce((a,b)=>a+b,0)} devices`;const fd=d.frequency_distribution||{};charts.frequency.data.datasets[0].data=[fd["2.4GHz"]||0,fd["5GHz"]||0,fd["6GHz"]||0];charts.frequency.update();document.getElementById("frequencySubtitle").textContent=`${(fd["2.4GHz"]||0)+(fd["5GHz"]||0)+(fd["6GHz"]||0)} devices`;charts.signalStrength.data.labels=d.signal_strength_avg.map(e=>new Date(e.timestamp).toLocaleTimeString());charts.signalStrength.data.datasets[0].data=d.signal_strength_avg.map(e=>e.avg_dbm);charts.signalStrength.update();document.getElementById("lastUpdate").textContent=`Updated: ${new Date(d.last_update).toLocaleTimeString()}`}catch(e){console.error("Dashboard update error:",e)}}
+        let charts={},speedtestInterval=null,renderProfile="standard",pendingCharts=new Set(),frameTimer=null,refreshTimer=null;
+        const lp=()=>renderProfile==="low-power";
+        async function loadRenderProfile(){try{const r=await fetch("/api/version");renderProfile=(await r.json()).render_profile||"standard"}catch(e){console.error("Error loading render profile:",e)}document.body.classList.toggle("low-power",lp());if(lp()){Chart.defaults.animation=!1;Chart.defaults.devicePixelRatio=1;Chart.defaults.elements.point.radius=0}}
+        function redraw(c){if(!lp()){c.update();return}pendingCharts.add(c);if(!frameTimer)frameTimer=setTimeout(()=>{frameTimer=null;pendingCharts.forEach(x=>x.update("none"));pendingCharts.clear()},1e3)}
+        function setLine(c,entries,k){if(lp())c.data.datasets[0].data=entries.map(e=>({x:Date.parse(e.timestamp),y:e[k]}));else{c.data.labels=entries.map(e=>new Date(e.timestamp).toLocaleTimeString());c.data.datasets[0].data=entries.map(e=>e[k])}redraw(c)}
+        function initCharts(){const o={maintainAspectRatio:!1,responsive:!0,plugins:{legend:{labels:{color:"#fff"}}}},lo=lp()?{...o,parsing:!1,normalized:!0,plugins:{...o.plugins,decimation:{enabled:!0,algorithm:"lttb",samples:60}},scales:{y:{ticks:{color:"#fff"}},x:{type:"linear",ticks:{color:"#fff",maxTicksLimit:6,callback:v=>new Date(v).toLocaleTimeString()}}}}:{...o,scales:{y:{ticks:{color:"#fff"}},x:{ticks:{color:"#fff"}}}};charts.users=new Chart(document.getElementById("usersChart").getContext("2d"),{type:"line",data:{labels:[],datasets:[{label:"Connected",data:[],borderColor:"#4da6ff",backgroundColor:"rgba(77,166,255,0.1)",tension:lp()?0:.4,fill:!lp()}]},options:lo});charts.deviceOS=new Chart(document.getElementById("deviceOSChart").getContext("2d"),{type:"doughnut",data:{labels:["iOS","Android","Windows","Other"],datasets:[{data:[0,0,0,0],backgroundColor:["#4da6ff","#51cf66","#74c0fc","#ffd43b"]}]},options:o});charts.frequency=new Chart(document.getElementById("frequencyChart").getContext("2d"),{type:"doughnut",data:{labels:["2.4 GHz","5 GHz","6 GHz"],datasets:[{data:[0,0,0],backgroundColor:["#ff922b","#4da6ff","#b197fc"]}]},options:o});charts.signalStrength=new Chart(document.getElementById("signalStrengthChart").getContext("2d"),{type:"line",data:{labels:[],datasets:[{label:"Avg Signal",data:[],borderColor:"#51cf66",backgroundColor:"rgba(81,207,102,0.1)",tension:lp()?0:.4,fill:!lp()}]},options:lo})}
+        async function updateDashboard(){try{const r=await fetch("/api/dashboard"),d=await r.json();setLine(charts.users,d.connected_users,"count");const os=d.device_os||{};charts.deviceOS.data.datasets[0].data=[os.iOS||0,os.Android||0,os.Windows||0,os.Other||0];redraw(charts.deviceOS);document.getElementById("deviceOsSubtitle").textContent=`${Object.values(os).reduce((a,b)=>a+b,0)} devices`;const fd=d.frequency_distribution||{};charts.frequency.data.datasets[0].data=[fd["2.4GHz"]||0,fd["5GHz"]||0,fd["6GHz"]||0];redraw(charts.frequency);document.getElementById("frequencySubtitle").textContent=`${(fd["2.4GHz"]||0)+(fd["5GHz"]||0)+(fd["6GHz"]||0)} devices`;setLine(charts.signalStrength,d.signal_strength_avg,"avg_dbm");document.getElementById("lastUpdate").textContent=`Updated: ${new Date(d.last_update).toLocaleTimeString()}`}catch(e){console.error("Dashboard update error:",e)}}
         function openModal(m){document.getElementById(m).classList.add("active")}
         function closeModal(m){document.getElementById(m).classList.remove("active")}
         window.onclick=function(e){if(e.target.classList.contains("modal"))e.target.classList.remove("active")}
         async function showDevices(){try{const r=await fetch("/api/devices"),data=await r.json(),c=document.getElementById("devicesList");if(!data.devices||data.devices.length===0)c.innerHTML='<p style="text-align:center;color:rgba(255,255,255,.6);">No devices found</p>';else c.innerHTML=data.devices.map(d=>`<div class="device-item"><div class="device-name">${d.name}</div><div class="device-info"><div class="device-info-item"><span class="device-label">IP:</span><span class="device-value">${d.ip}</span></div><div class="device-info-item"><span class="device-label">MAC:</span><span class="device-value">${d.mac}</span></div><div class="device-info-item"><span class="device-label">Manufacturer:</span><span class="device-value">${d.manufacturer}</span></div><div class="device-info-item"><span class="device-label">OS:</span><span class="device-value">${d.device_os}</span></div><div class="device-info-item"><span class="device-label">Frequency:</span><span class="device-value">${d.frequency}</span></div><div class="device-info-item"><span class="device-label">Signal:</span><span class="device-value">${d.signal_quality} (${d.signal_avg_dbm})</span></div></div><div class="signal-bar"><div class="signal-fill" style="width:${d.signal_avg}%"></div></div></div>`).join("");openModal("devicesModal")}catch(e){console.error("Error loading devices:",e)}}
         async function runSpeedTest(){const btn=document.getElementById("startSpeedtest"),status=document.getElementById("speedtestStatus"),results=document.getElementById("speedtestResults");btn.disabled=!0;status.innerHTML='<div class="spinner"></div><p>Running speed test...</p>';results.innerHTML="";try{await fetch("/api/speedtest/start",{method:"POST"});speedtestInterval=setInterval(async()=>{const r=await fetch("/api/speedtest/status"),data=await r.json();if(!data.running&&data.result){clearInterval(speedtestInterval);btn.disabled=!1;status.innerHTML="";if(data.result.error)results.innerHTML=`<div class="alert alert-error">Error: ${data.result.error}</div>`;else results.innerHTML=`<div class="speedtest-results"><div class="speedtest-metric"><div class="speedtest-label">Download</div><div class="speedtest-value">${data.result.download}<span class="speedtest-unit">Mbps</span></div></div><div class="speedtest-metric"><div class="speedtest-label">Upload</div><div class="speedtest-value">${data.result.upload}<span class="speedtest-unit">Mbps</span></div></div><div class="speedtest-metric"><div class="speedtest-label">Ping</div><div class="speedtest-value">${data.result.ping}<span class="speedtest-unit">ms</span></div></div></div>`}},2e3)}catch(e){btn.disabled=!1;status.innerHTML="";results.innerHTML='<div class="alert alert-error">Failed to start speed test</div>'}}
         async function showAdmin(){await loadAdminInfo();openModal("adminModal")}
-        async function loadAdminInfo(){try{const r=await fetch("/api/version"),data=await r.json();document.getElementById("adminInfo").innerHTML=`<div class="admin-info-item"><span>Version:</span><span>${data.version}</span></div><div class="admin-info-item"><span>Network ID:</span><span>${data.network_id}</span></div><div class="admin-info-item"><span>Environment:</span><span>${data.environment}</span></div><div class="admin-info-item"><span>API URL:</span><span>${data.api_url}</span></div>`}catch(e){console.error("Error loading admin info:",e)}}
+        async function loadAdminInfo(){try{const r=await fetch("/api/version"),data=await r.json();document.getElementById("adminInfo").innerHTML=`<div class="admin-info-item"><span>Version:</span><span>${data.version}</span></div><div class="admin-info-item"><span>Network ID:</span><span>${data.network_id}</span></div><div class="admin-info-item"><span>Environment:</span><span>${data.environment}</span></div><div class="admin-info-item"><span>API URL:</span><span>${data.api_url}</span></div><div class="admin-info-item"><span>Render Profile:</span><span>${data.render_profile||"standard"}</span></div>`}catch(e){console.error("Error loading admin info:",e)}}
         function showAlert(m,t="info"){const a=document.getElementById("adminAlerts");a.innerHTML=`<div class="alert alert-${t}">${m}</div>`;setTimeout(()=>{a.innerHTML=""},5e3)}
         async function checkForUpdates(){try{const r=await fetch("/api/admin/check-update"),data=await r.json();if(data.update_available){if(confirm(`Update available: v${data.latest_version}\\nCurrent: v${data.current_version}\\n\\nUpdate now?`)){const ur=await fetch("/api/admin/update",{method:"POST"}),udata=await ur.json();showAlert(udata.message,udata.success?"success":"error");if(udata.success)setTimeout(()=>location.reload(),3e3)}}else showAlert("You are running the latest version","success")}catch(e){showAlert("Failed to check for updates","error")}}
         function showNetworkIdForm(){document.getElementById("adminFormContainer").innerHTML='<div class="form-group"><label class="form-label">New Network ID:</label><input type="text" id="newNetworkId" class="form-input" placeholder="Enter network ID"><button class="form-btn" style="margin-top:10px" onclick="changeNetworkId()">Update Network ID</button></div>'}
@@ -1165,16 +1221,123 @@ def create_frontend():
         async function verifyAuthCode(){const code=document.getElementById("authCode").value.trim();if(!code){showAlert("Code required","error");return}try{const r=await fetch("/api/admin/reauthorize",{method:"POST",headers:{"Content-Type":"application/json"},body:JSON.stringify({step:"verify",code})}),data=await r.json();showAlert(data.message,data.success?"success":"error");if(data.success){document.getElementById("adminFormContainer").innerHTML="";document.getElementById("codeFormContainer").innerHTML=""}}catch(e){showAlert("Failed to verify code","error")}}
         async function restartService(){if(!confirm("Restart the dashboard service?"))return;try{const r=await fetch("/api/admin/restart",{method:"POST"}),data=await r.json();showAlert(data.message,data.success?"success":"error");if(data.success)setTimeout(()=>location.reload(),3e3)}catch(e){showAlert("Failed to restart service","error")}}
         async function rebootSystem(){if(!confirm("Reboot the entire system? This will take a few minutes."))return;try{const r=await fetch("/api/admin/reboot",{method:"POST"}),data=await r.json();showAlert("System is rebooting...","info");closeModal("adminModal")}catch(e){showAlert("Failed to reboot system","error")}}
-        window.addEventListener("load",()=>{initCharts();updateDashboard();setInterval(updateDashboard,6e4)});
+        function showRenderProfileForm(){document.getElementById("adminFormContainer").innerHTML='<div class="form-group"><label class="form-label">Render Profile:</label><select id="renderProfileSelect" class="form-input"><option value="standard">Standard (animated, smooth curves)</option><option value="low-power">Low power (static charts, for Raspberry Pi kiosks)</option></select><button class="form-btn" style="margin-top:10px" onclick="changeRenderProfile()">Update Render Profile</button></div>';document.getElementById("renderProfileSelect").value=renderProfile}
+        async function changeRenderProfile(){const profile=document.getElementById("renderProfileSelect").value;try{const r=await fetch("/api/admin/render-profile",{method:"POST",headers:{"Content-Type":"application/json"},body:JSON.stringify({render_profile:profile})}),data=await r.json();showAlert(data.message,data.success?"success":"error");if(data.success)setTimeout(()=>location.reload(),1500)}catch(e){showAlert("Failed to update render profile","error")}}
+        document.addEventListener("visibilitychange",()=>{if(!lp())return;if(document.hidden){clearInterval(refreshTimer);refreshTimer=null}else if(!refreshTimer){updateDashboard();refreshTimer=setInterval(updateDashboard,6e4)}});
+        window.addEventListener("load",async()=>{await loadRenderProfile();initCharts();updateDashboard();refreshTimer=setInterval(updateDashboard,6e4)});
+        if("serviceWorker"in navigator){const hadWorker=!!navigator.serviceWorker.controller;navigator.serviceWorker.register("/sw.js").catch(e=>console.error("Service worker registration failed:",e));navigator.serviceWorker.addEventListener("controllerchange",()=>{if(hadWorker)location.reload()})}
     </script>
 </body>
 </html>"""
     
+    build_frontend(frontend_html)
+    run_command(f'chown -R {USER}:{USER} {INSTALL_DIR}/frontend')
+    print_success("Frontend created")
+
+def fetch_vendor(url):
+    """Download a third-party asset, falling back to the copy from the last install"""
+    cached = os.path.join(VENDOR_DIR, url.rsplit('/', 1)[-1])
+    try:
+        r = requests.get(url, timeout=30)
+        r.raise_for_status()
+        os.makedirs(VENDOR_DIR, exist_ok=True)
+        with open(cached, 'wb') as f:
+            f.write(r.content)
+        return r.content
+    except Exception as e:
+        if os.path.exists(cached):
+            print_warning(f"Download failed, using cached {os.path.basename(cached)}")
+            with open(cached, 'rb') as f:
+                return f.read()
+        print_warning(f"Could not download {url}: {e}")
+        return None
+
+def write_asset(name, data):
+    """Write data as a content-hashed asset plus precompressed variants, returning its URL"""
+    if isinstance(data, str):
+        data = data.encode()
+    stem, ext = name.rsplit('.', 1)
+    filename = f"{stem}.{hashlib.sha256(data).hexdigest()[:10]}.{ext}"
+    path = f"{INSTALL_DIR}/frontend/assets/{filename}"
+    with open(path, 'wb') as f:
+        f.write(data)
+    if ext not in ('woff2', 'png', 'jpg'):  # Already compressed
+        with open(path + '.gz', 'wb') as f:
+            f.write(gzip.compress(data, 9))
+        if brotli:
+            with open(path + '.br', 'wb') as f:
+                f.write(brotli.compress(data))
+    return f"/assets/{filename}"
+
+def vendor_fontawesome():
+    """Vendor the Font Awesome stylesheet and webfonts, returning their URLs (stylesheet first)"""
+    css = fetch_vendor(FONTAWESOME_URL)
+    if css is None:
+        return None
+    css = css.decode()
+    fonts = []
+    for font in sorted(set(re.findall(r'url\(\.\./webfonts/([\w.-]+)\)', css))):
+        data = fetch_vendor(f"{FONTAWESOME_FONTS}/{font}")
+        if data is None:
+            return None
+        fonts.append(write_asset(font, data))
+        css = css.replace(f"../webfonts/{font}", fonts[-1])
+    return [write_asset('fontawesome.css', css)] + fonts
+
+def build_frontend(frontend_html):
+    """Turn the page template into a self-contained build the kiosk can run offline
+
+    Chart.js and Font Awesome are vendored, the inline CSS and JS move to
+    content-hashed files (served with immutable caching by the backend) and
+    sw.js caches the shell so the kiosk paints from cache through outages.
+    """
+    assets = f"{INSTALL_DIR}/frontend/assets"
+    os.makedirs(assets, exist_ok=True)
+    for name in os.listdir(assets):
+        if FINGERPRINTED.match(name):
+            os.remove(os.path.join(assets, name))
+    
+    style = re.search(r'<style>(.*?)</style>', frontend_html, re.S)
+    script = re.search(r'<script>(.*?)</script>', frontend_html, re.S)
+    app_css = write_asset('app.css', style.group(1).strip())
+    app_js = write_asset('app.js', script.group(1).strip())
+    html = frontend_html.replace(style.group(0), f'<link rel="stylesheet" href="{app_css}">')
+    html = html.replace(script.group(0), f'<script src="{app_js}"></script>')
+    shell = [app_css, app_js]
+    
+    chart = fetch_vendor(CHARTJS_URL)
+    if chart is not None:
+        url = write_asset('chart.js', chart)
+        html = html.replace(CHARTJS_URL, url)
+        shell.append(url)
+    else:
+        print_warning("Chart.js not vendored - the dashboard will load it from the CDN")
+    fontawesome = vendor_fontawesome()
+    if fontawesome is not None:
+        html = html.replace(FONTAWESOME_URL, fontawesome[0])
+        shell.extend(fontawesome)
+    else:
+        print_warning("Font Awesome not vendored - icons will load from the CDN")
+    
     with open(f"{INSTALL_DIR}/frontend/index.html", 'w') as f:
-        f.write(frontend_html)
+        f.write(html)
+    with open(f"{INSTALL_DIR}/frontend/index.html.gz", 'wb') as f:
+        f.write(gzip.compress(html.encode(), 9))
     
-    run_command(f'chown {USER}:{USER} {INSTALL_DIR}/frontend/index.html')
-    print_success("Frontend created")
+    # Shell: cache first, fingerprinted assets: cache first, API: network first with the
+    # last good response as fallback so charts still render while the uplink is down
+    build = hashlib.sha256(html.encode()).hexdigest()[:10]
+    sw = """const SHELL_CACHE="eero-shell-BUILD",API_CACHE="eero-api",SHELL=["/",ASSETS];
+self.addEventListener("install",e=>{e.waitUntil(caches.open(SHELL_CACHE).then(c=>c.addAll(SHELL)).then(()=>self.skipWaiting()))});
+self.addEventListener("activate",e=>{e.waitUntil(caches.keys().then(keys=>Promise.all(keys.filter(k=>k!==SHELL_CACHE&&k!==API_CACHE).map(k=>caches.delete(k)))).then(()=>self.clients.claim()))});
+self.addEventListener("fetch",e=>{const r=e.request,u=new URL(r.url);if(r.method!=="GET"||u.origin!==location.origin||u.pathname.startsWith("/api/admin/"))return;
+if(u.pathname.startsWith("/api/")){e.respondWith(fetch(r).then(res=>{if(res.ok){const copy=res.clone();caches.open(API_CACHE).then(c=>c.put(r,copy))}return res}).catch(()=>caches.match(r,{cacheName:API_CACHE}).then(m=>m||Response.error())));return}
+if(r.mode==="navigate"){e.respondWith(caches.match("/",{cacheName:SHELL_CACHE}).then(m=>m||fetch(r)));return}
+e.respondWith(caches.match(r).then(m=>m||fetch(r)))});
+""".replace('BUILD', build).replace('ASSETS', ','.join(json.dumps(url) for url in shell))
+    with open(f"{INSTALL_DIR}/frontend/sw.js", 'w') as f:
+        f.write(sw)
+    print_info(f"Frontend build {build}: {len(shell)} fingerprinted assets")
 
 def create_service():
     print_info("Creating service...")
@@ -1210,8 +1373,22 @@ WantedBy=multi-user.target
         print_warning("Service may have issues - checking logs...")
         subprocess.run(['journalctl', '-u', 'eero-dashboard', '-n', '30', '--no-pager'])
 
+def is_raspberry_pi():
+    try:
+        with open('/proc/device-tree/model') as f:
+            return 'Raspberry Pi' in f.read()
+    except OSError:
+        return False
+
 def create_kiosk():
     print_info("Setting up kiosk mode...")
+    config = load_config()
+    if 'render_profile' not in config:
+        # Static, 1x charts keep the Pi's CPU and GPU (and the board) cool
+        config['render_profile'] = 'low-power' if is_raspberry_pi() else 'standard'
+        save_config(config)
+    print_info(f"Render profile: {config['render_profile']} (change it from the π menu)")
+    
     kiosk = f"""#!/bin/bash
 sleep 5
 xset s off 2>/dev/null
@@ -1232,6 +1409,28 @@ fi
         f.write(kiosk)
     os.chmod(f"{INSTALL_DIR}/start_kiosk.sh", 0o755)
     
+    # Compare render profiles on the device: run once per profile and note the numbers
+    cpu_check = """#!/bin/bash
+# Usage: kiosk_cpu.sh [seconds] - average kiosk browser CPU over the window
+WINDOW=${1:-120}
+HZ=$(getconf CLK_TCK)
+ticks() {
+    for pid in $(pgrep -f chromium); do
+        awk '{print $14 + $15}' /proc/$pid/stat 2>/dev/null
+    done | awk '{s += $1} END {print s + 0}'
+}
+PROFILE=$(curl -s http://localhost/api/version | python3 -c "import sys, json; print(json.load(sys.stdin).get('render_profile', 'standard'))" 2>/dev/null)
+START=$(ticks)
+sleep "$WINDOW"
+END=$(ticks)
+awk -v a="$START" -v b="$END" -v hz="$HZ" -v t="$WINDOW" -v p="$PROFILE" \\
+    'BEGIN {printf "Profile %s: chromium %.1f%% of one core over %ds\\n", p, (b - a) / hz / t * 100, t}'
+command -v vcgencmd &>/dev/null && vcgencmd measure_temp
+"""
+    with open(f"{INSTALL_DIR}/kiosk_cpu.sh", 'w') as f:
+        f.write(cpu_check)
+    os.chmod(f"{INSTALL_DIR}/kiosk_cpu.sh", 0o755)
+    
     autostart_dir = f'/home/{USER}/.config/autostart'
     Path(autostart_dir).mkdir(parents=True, exist_ok=True)
     